@@ -12,7 +12,10 @@ from .core import ClutterBot
 
 async def main() -> None:
     async with await ClutterBot.init() as bot:
-        init(bot.config["SENTRY_URL"], traces_sample_rate=1.0)
+        init(
+            bot.config["SENTRY_URL"],
+            traces_sampler=bot.traces_sampler,
+        )
 
         install()
 
@@ -1,15 +1,13 @@
 from __future__ import annotations
 
 import logging as log
-from asyncio import gather
 from traceback import format_exception
 from typing import TYPE_CHECKING
 
 from discord.app_commands import AppCommandError
 from discord.ext.commands import Cog, CommandError, CommandNotFound
-from sentry_sdk import capture_exception
 
-from ..utils import TextFile, color, format_as_list, run_in_executor
+from ..utils import color, format_as_list
 
 if TYPE_CHECKING:
     from ..core import ClutterBot, ClutterContext, ClutterInteraction
@@ -18,7 +16,6 @@ if TYPE_CHECKING:
 class ErrorHandler(Cog):
     def __init__(self, bot: ClutterBot) -> None:
         self.bot = bot
-        self.capture_exception = run_in_executor(capture_exception)
 
     async def handle_error(
         self,
@@ -47,18 +44,20 @@ class ErrorHandler(Cog):
                 f" {ctx.author.id}."
             )
 
-        await gather(
-            self.capture_exception(error),
-            self.bot.error_webhook.send(
-                file=TextFile(
-                    f"{head}\nCommand: {ctx.command.qualified_name}\nTraceback:\n{traceback}",  # type: ignore
-                    "error.txt",
-                )
-            ),
-            ctx.reply_embed.error(
-                await ctx.i18n("ERROR.RESPONSE.TITLE"),
-                await ctx.i18n("ERROR.RESPONSE.BODY"),
-            ),
+        # The next runs of the command are traced, to see where it fails.
+        self.bot.traces_sampler.mark_failed(ctx.command.qualified_name)  # type: ignore
+
+        # Both are sent in the background, the reply doesn't wait for them.
+        self.bot.exception_reporter.capture(error)
+        self.bot.error_dispatcher.report(
+            error, f"{head}\nCommand: {ctx.command.qualified_name}"  # type: ignore
+        )
+
+        t = await ctx.translator()
+
+        await ctx.reply_embed.error(
+            t("ERROR.RESPONSE.TITLE"),
+            t("ERROR.RESPONSE.BODY"),
         )
 
     @Cog.listener()
@@ -26,6 +26,8 @@ class Miscellaneous(
         help="COMMANDS.PING.HELP",
     )
     async def ping(self, ctx: ClutterContext) -> None:
+        t = await ctx.translator()
+
         ping = monotonic()
 
         message = await ctx.reply("** **")
@@ -34,8 +36,8 @@ class Miscellaneous(
 
         await message.edit(
             embed=self.bot.embed.info(
-                await ctx.i18n("COMMANDS.PING.RESPONSE.TITLE"),
-                await ctx.i18n(
+                t("COMMANDS.PING.RESPONSE.TITLE"),
+                t(
                     "COMMANDS.PING.RESPONSE.BODY",
                     ws=int(self.bot.latency * 1000),
                     msg=int(ping * 1000),
@@ -46,6 +48,8 @@ class Miscellaneous(
 
     @slash_command(name="ping", description="COMMANDS.PING.BRIEF")  # type: ignore
     async def slash_ping(self, ctx: ClutterInteraction) -> None:
+        t = await ctx.translator()
+
         ping = monotonic()
 
         await ctx.response.send_message("** **")
@@ -53,8 +57,8 @@ class Miscellaneous(
         ping = monotonic() - ping
         await ctx.edit_original_message(
             embed=self.bot.embed.info(
-                await ctx.i18n("COMMANDS.PING.RESPONSE.TITLE"),
-                await ctx.i18n(
+                t("COMMANDS.PING.RESPONSE.TITLE"),
+                t(
                     "COMMANDS.PING.RESPONSE.BODY",
                     ws=int(self.bot.latency * 1000),
                     msg=int(ping * 1000),
@@ -73,16 +77,18 @@ class Miscellaneous(
 
         user: User | Member
 
+        t = await ctx.translator()
+
         embed = self.bot.embed.info(
-            await ctx.i18n("COMMANDS.INFO.RESPONSE.TITLE", user=user),
-            await ctx.i18n(
+            t("COMMANDS.INFO.RESPONSE.TITLE", user=user),
+            t(
                 "COMMANDS.INFO.RESPONSE.BODY",
                 id=user.id,
                 created_at=f"<t:{int(user.created_at.timestamp())}:F>",
             )
             + (
                 "\n"
-                + await ctx.i18n(
+                + t(
                     "COMMANDS.INFO.RESPONSE.JOINED_AT",
                     joined_at=f"<t:{int(user.joined_at.timestamp())}:F>",  # type: ignore
                 )
@@ -93,7 +99,7 @@ class Miscellaneous(
 
         if ctx.guild and user.roles:  # type: ignore
             embed.add_field(
-                await ctx.i18n("COMMANDS.INFO.FIELDS.ROLES"),
+                t("COMMANDS.INFO.FIELDS.ROLES"),
                 ", ".join(
                     role.mention
                     for role in user.roles  # type: ignore
@@ -11,6 +11,8 @@ from discord.ext.commands import (
     is_owner,
 )
 
+from ..utils import TextFile
+
 if TYPE_CHECKING:
     from ..core import ClutterBot, ClutterContext
 
@@ -32,45 +34,152 @@ class Owner(
         ctx: ClutterContext,
         guilds: Greedy[discord.Object],
         spec: Optional[Literal[".", "*"]] = None,
+        force: Optional[Literal["force"]] = None,
     ) -> None:
+        t = await ctx.translator()
+        forced = force is not None
+
         if not guilds:
             if not ctx.guild and not spec:
                 raise NoPrivateMessage()
 
             if spec == ".":
-                commands = await self.bot.tree.sync(guild=ctx.guild)
+                commands = await self.bot.tree.sync_if_changed(
+                    guild=ctx.guild, force=forced
+                )
             elif spec == "*":
                 self.bot.tree.copy_global_to(guild=ctx.guild)  # type: ignore
-                commands = await self.bot.tree.sync(guild=ctx.guild)
+                commands = await self.bot.tree.sync_if_changed(
+                    guild=ctx.guild, force=forced
+                )
             else:
-                commands = await self.bot.tree.sync()
+                commands = await self.bot.tree.sync_if_changed(force=forced)
 
             await ctx.reply_embed.success(
-                await ctx.i18n("COMMANDS.SYNC.RESPONSE.TITLE"),
-                await ctx.i18n(
+                t("COMMANDS.SYNC.RESPONSE.TITLE"),
+                t("COMMANDS.SYNC.RESPONSE.BODY_4")
+                if commands is None
+                else t(
                     f"COMMANDS.SYNC.RESPONSE.BODY_{'1' if spec else '2'}",
                     count=len(commands),
                 ),
             )
         else:
-            synced = 0
+            synced = up_to_date = 0
             for guild in guilds:
                 try:
-                    await self.bot.tree.sync(guild=guild)
+                    commands = await self.bot.tree.sync_if_changed(
+                        guild=guild, force=forced
+                    )
                 except discord.HTTPException:
                     pass
                 else:
-                    synced += 1
+                    if commands is None:
+                        up_to_date += 1
+                    else:
+                        synced += 1
 
             await ctx.reply_embed.success(
-                await ctx.i18n("COMMANDS.SYNC.RESPONSE.TITLE"),
-                await ctx.i18n(
+                t("COMMANDS.SYNC.RESPONSE.TITLE"),
+                t(
                     "COMMANDS.SYNC.RESPONSE.BODY_3",
-                    success=synced,
+                    synced=synced,
+                    up_to_date=up_to_date,
                     total=len(guilds),
                 ),
             )
 
+    @command(
+        name="reload-i18n",
+        aliases=("reload_i18n", "reloadi18n"),
+        brief="COMMANDS.RELOAD_I18N.BRIEF",
+        help="COMMANDS.RELOAD_I18N.HELP",
+        hidden=True,
+    )
+    @is_owner()
+    async def reload_i18n(self, ctx: ClutterContext) -> None:
+        changed = self.bot.i18n.reload()
+
+        # Translated after reloading, so a fixed response shows up already.
+        t = await ctx.translator()
+
+        await ctx.reply_embed.success(
+            t("COMMANDS.RELOAD_I18N.RESPONSE.TITLE"),
+            t(
+                "COMMANDS.RELOAD_I18N.RESPONSE.BODY_1",
+                languages=", ".join(f"`{language}`" for language in changed),
+            )
+            if changed
+            else t("COMMANDS.RELOAD_I18N.RESPONSE.BODY_2"),
+        )
+
+    @command(
+        brief="COMMANDS.METRICS.BRIEF",
+        help="COMMANDS.METRICS.HELP",
+        hidden=True,
+    )
+    @is_owner()
+    async def metrics(self, ctx: ClutterContext) -> None:
+        t = await ctx.translator()
+
+        if self.bot.metrics is None:
+            await ctx.reply_embed.error(
+                t("COMMANDS.METRICS.RESPONSE.TITLE"),
+                t("COMMANDS.METRICS.RESPONSE.BODY_2"),
+            )
+            return
+
+        await ctx.reply_embed.info(
+            t("COMMANDS.METRICS.RESPONSE.TITLE"),
+            t("COMMANDS.METRICS.RESPONSE.BODY_1"),
+            file=TextFile(self.bot.metrics.summary(), "metrics.txt"),
+        )
+
+    @command(
+        brief="COMMANDS.PROFILE.BRIEF",
+        help="COMMANDS.PROFILE.HELP",
+        hidden=True,
+    )
+    @is_owner()
+    async def profile(
+        self,
+        ctx: ClutterContext,
+        seconds: float = 10.0,
+        *,
+        command: Optional[str] = None,
+    ) -> None:
+        t = await ctx.translator()
+        profiler = self.bot.profiler
+
+        if not profiler.supported or profiler.running:
+            await ctx.reply_embed.error(
+                t("COMMANDS.PROFILE.RESPONSE.TITLE"),
+                t(
+                    "COMMANDS.PROFILE.RESPONSE.BODY_3"
+                    if profiler.running
+                    else "COMMANDS.PROFILE.RESPONSE.BODY_4"
+                ),
+            )
+            return
+
+        seconds = min(max(seconds, 1.0), 120.0)
+
+        async with ctx.typing():
+            stacks = await profiler.profile(seconds, command=command)
+
+        if not stacks:
+            await ctx.reply_embed.info(
+                t("COMMANDS.PROFILE.RESPONSE.TITLE"),
+                t("COMMANDS.PROFILE.RESPONSE.BODY_2", seconds=seconds),
+            )
+            return
+
+        await ctx.reply_embed.success(
+            t("COMMANDS.PROFILE.RESPONSE.TITLE"),
+            t("COMMANDS.PROFILE.RESPONSE.BODY_1", seconds=seconds),
+            file=TextFile(stacks, "profile.txt"),
+        )
+
 
 async def setup(bot: ClutterBot) -> None:
     await bot.add_cog(Owner(bot))
@@ -1,5 +1,10 @@
+from .blacklist import *
 from .bot import *
+from .checks import *
 from .command_tree import *
 from .context import *
 from .errors import *
 from .interaction import *
+from .prefix import *
+from .spam_control import *
+from .translator import *
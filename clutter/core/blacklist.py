@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from asyncio import gather
+from typing import TYPE_CHECKING, Any, Literal
+
+if TYPE_CHECKING:
+    from ..utils.db import CachedMongoManager
+
+__all__ = ("Blacklist",)
+
+
+class Blacklist:
+    # Every blacklisted user and guild ID is kept in memory, so the checks that
+    # run for every command don't need any database lookups.
+    def __init__(self, db: CachedMongoManager) -> None:
+        self._db = db
+        self.users: set[int] = set()
+        self.guilds: set[int] = set()
+
+    async def load(self) -> None:
+        users, guilds = await gather(
+            self._db.find_ids("users", {"blacklisted": True}),
+            self._db.find_ids("guilds", {"blacklisted": True}),
+        )
+
+        self.users = {int(_id) for _id in users}
+        self.guilds = {int(_id) for _id in guilds}
+
+    def _ids(self, object_type: Literal["guild", "user"]) -> set[int]:
+        return self.guilds if object_type == "guild" else self.users
+
+    async def add(
+        self, object_id: int, *, object_type: Literal["guild", "user"]
+    ) -> bool:
+        ids = self._ids(object_type)
+
+        if object_id in ids:
+            return False
+
+        # Written first, so a failed write doesn't leave it applied in memory.
+        await self._db.set(f"{object_type}s.{object_id}.blacklisted", True)
+        ids.add(object_id)
+        return True
+
+    async def remove(
+        self, object_id: int, *, object_type: Literal["guild", "user"]
+    ) -> bool:
+        ids = self._ids(object_type)
+
+        if object_id not in ids:
+            return False
+
+        await self._db.set(f"{object_type}s.{object_id}.blacklisted", False)
+        ids.discard(object_id)
+        return True
+
+    def handle_change(self, change: dict[str, Any]) -> None:
+        # Listener for ChangeWatcher, picks up blacklists made by other processes.
+        match change["ns"]["coll"]:
+            case "users":
+                ids = self.users
+            case "guilds":
+                ids = self.guilds
+            case _:
+                return
+
+        object_id = int(change["documentKey"]["_id"])
+
+        match change["operationType"]:
+            case "update":
+                description = change["updateDescription"]
+
+                if "blacklisted" in description.get("updatedFields", {}):
+                    blacklisted = description["updatedFields"]["blacklisted"]
+                elif "blacklisted" in description.get("removedFields", []):
+                    blacklisted = False
+                else:
+                    return
+
+            case "insert" | "replace":
+                blacklisted = change.get("fullDocument", {}).get("blacklisted")
+
+            case _:
+                blacklisted = False
+
+        if blacklisted:
+            ids.add(object_id)
+        else:
+            ids.discard(object_id)
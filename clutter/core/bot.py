@@ -1,13 +1,12 @@
 from __future__ import annotations
 
-from asyncio import create_task, gather
-from collections import Counter
+from asyncio import gather, to_thread
 from itertools import chain
 from pathlib import Path
 from re import MULTILINE, search
 from time import time
 from traceback import format_exc
-from typing import TYPE_CHECKING, Any, Awaitable
+from typing import Any, Awaitable
 
 from aiohttp import ClientSession
 from discord import (
@@ -24,26 +23,41 @@ from discord import (
 )
 from discord.ext.commands import (
     AutoShardedBot,
-    BucketType,
     Command,
-    CommandOnCooldown,
-    CooldownMapping,
     ExtensionFailed,
     ExtensionNotFound,
     NoEntryPointError,
 )
 from discord.utils import oauth_url
-
-from ..utils import color, format_as_list
-from ..utils.db import CachedMongoManager
+from sentry_sdk import start_transaction
+
+from ..utils import (
+    ExceptionReporter,
+    Metrics,
+    MetricsServer,
+    SamplingProfiler,
+    TracesSampler,
+    color,
+    current_command,
+    format_as_list,
+)
+from ..utils.db import (
+    CachedMongoManager,
+    ChangeWatcher,
+    TinyLFU,
+    TTLPolicy,
+)
 from ..utils.embed import EmbedCreator
-from ..utils.i18n import I18N
+from ..utils.i18n import I18N, LanguageFileWatcher
+from ..utils.webhook import ErrorDispatcher, LogSink, RateLimiter
+from .blacklist import Blacklist
+from .checks import CheckPipeline
 from .command_tree import ClutterCommandTree
 from .context import ClutterContext
-from .errors import UserHasBeenBlacklisted, UserIsBlacklisted
-
-if TYPE_CHECKING:
-    from .interaction import ClutterInteraction
+from .instrumentation import instrument
+from .prefix import PrefixResolver
+from .spam_control import SpamControl
+from .translator import ClutterTranslator
 
 __all__ = ("ClutterBot",)
 
@@ -95,27 +109,49 @@ class ClutterBot(AutoShardedBot):
         self.default_prefix = config["BOT_DEFAULT_PREFIX"]
 
         # Auto spam control for commands.
-        # Frequent triggering of this filter (3 times in a row) will result in a blacklist.
-        mapping = CooldownMapping.from_cooldown(10, 12, BucketType.user)
-
-        class SpamControl:
-            # noinspection PyProtectedMember
-            cooldown = mapping._cooldown
-            get_bucket = mapping.get_bucket
-            counter = Counter()
-
-        self.spam_control = SpamControl()
+        # Getting rate limited 3 times in 10 minutes results in a blacklist.
+        self.spam_control = SpamControl(10, 12, max_strikes=3)
 
         self.embed = EmbedCreator(config["STYLE"])
 
         self.db = CachedMongoManager(
-            config["MONGO_URI"], database="clutter", max_items=5000
+            config["MONGO_URI"],
+            database="clutter",
+            max_items=5000,
+            cache_documents=True,
+            ttl=TTLPolicy(600),
+            max_bytes=32 * 1024 * 1024,
+            admission=TinyLFU(5000),
+            write_behind=config.get("MONGO_WRITE_BEHIND", False),
         )
+        self.blacklist = Blacklist(self.db)
+
+        # Keeps the cache coherent with writes made by other processes.
+        self.db_watcher = (
+            # Most users never get a document, the filter skips their lookups.
+            ChangeWatcher(
+                self.db, ("guilds", "users"), bloom_filters=("users",)
+            )
+            if config.get("MONGO_WATCH", False)
+            else None
+        )
+
+        self.prefix_resolver = PrefixResolver(self.db, self.default_prefix)
+
+        if self.db_watcher:
+            self.db_watcher.add_listener(self.blacklist.handle_change)
+            self.db_watcher.add_listener(self.prefix_resolver.handle_change)
+
         self.i18n = I18N(
             str(ROOT_DIR / "i18n"),
             db=self.db,
             fallback_language=self.default_language,
         )
+        self.i18n_watcher = (
+            LanguageFileWatcher(self.i18n)
+            if config.get("I18N_WATCH", False)
+            else None
+        )
 
         self.error_webhook = Webhook.from_url(
             config["ERROR_WEBHOOK_URL"], session=self.session
@@ -123,92 +159,33 @@ class ClutterBot(AutoShardedBot):
         self.log_webhook = Webhook.from_url(
             config["LOG_WEBHOOK_URL"], session=self.session
         )
+        # Both webhooks share a limiter, a 429 pauses all webhook sends.
+        self.webhook_limiter = RateLimiter()
+        self.error_dispatcher = ErrorDispatcher(
+            self.error_webhook, limiter=self.webhook_limiter
+        )
+        self.log_sink = LogSink(self.log_webhook, limiter=self.webhook_limiter)
+        self.exception_reporter = ExceptionReporter()
+        self.traces_sampler = TracesSampler(
+            rates=config.get("SENTRY_TRACE_RATES")
+        )
 
-        @self.check
-        @self.tree.check
-        async def guild_blacklist_check(
-            ctx: ClutterContext | ClutterInteraction,
-        ) -> bool:
-            # noinspection PyTypeChecker
-            return (
-                (
-                    await self.is_owner(ctx.guild.owner)
-                    if ctx.guild.owner
-                    else False
-                )
-                or await self.guild_check(ctx.guild)
-                if ctx.guild
-                else True
-            )
-
-        @self.check
-        @self.tree.check
-        async def user_blacklist_check(
-            ctx: ClutterContext | ClutterInteraction,
-        ) -> bool:
-            if not await self.is_owner(ctx.author) and await self.db.get(
-                f"users.{ctx.author.id}.blacklisted"
-            ):
-                raise UserIsBlacklisted("You are banned from using this bot.")
-            return True
-
-        @self.check
-        # TODO: @bot.tree.check
-        async def global_cooldown_check(ctx: ClutterContext) -> bool:
-            author = ctx.author
-
-            if await self.is_owner(author):
-                return True
-
-            author_id = author.id
-            counter = self.spam_control.counter
-
-            if not (
-                retry_after := self.spam_control.get_bucket(
-                    ctx.message
-                ).update_rate_limit(  # type: ignore
-                    ctx.message.created_at.timestamp()
-                )
-            ):
-                return True
+        # One pipeline covers the global checks of prefix and app commands.
+        self.check_pipeline = CheckPipeline(self)
+        self.check(self.check_pipeline)
+        self.tree.check(self.check_pipeline)
 
-            counter[author_id] += 1
+        self.profiler = SamplingProfiler()
 
-            if counter[author_id] < 3:
-                raise CommandOnCooldown(
-                    bot.spam_control.cooldown, retry_after, BucketType.user  # type: ignore
-                )
+        # Without METRICS nothing is timed, so it costs nothing.
+        self.metrics = Metrics() if config.get("METRICS", False) else None
+        self.metrics_server = None
 
-            await self.blacklist_user(author_id)
-            del counter[author_id]
-
-            embed = self.embed.warning(
-                f"**{author}** has been blacklisted for spamming!",
-                f"Incident time: <t:{int(time())}:F>",
-            ).add_field(
-                title="User Info",
-                description=(
-                    f"**Mention:** {author.mention}\n**Tag:**"
-                    f" {author}\n**ID:** {author.id}"
-                ),
-            )
-            if ctx.guild:
-                channel = ctx.channel
-                embed.add_field(
-                    title="Guild Info",
-                    description=(
-                        f"**Name:** {ctx.guild.name}\n**ID:**"
-                        f" {ctx.guild.id}\n[Jump!](https://discord.com/channels/{ctx.guild.id})"
-                    ),
-                ).add_field(
-                    title="Channel Info",
-                    description=f"**Mention:** {channel.mention}\n**Name:** {channel.name}\n**ID:** {channel.id}\n[Jump!]({channel.jump_url})",  # type: ignore
-                )
+        if self.metrics:
+            instrument(self, self.metrics)
 
-            create_task(self.log_webhook.send(embed=embed))
-            raise UserHasBeenBlacklisted(
-                "You have been blacklisted for spamming commands."
-            )
+            if port := config.get("METRICS_PORT"):
+                self.metrics_server = MetricsServer(self.metrics, port)
 
         return self
 
@@ -218,6 +195,22 @@ class ClutterBot(AutoShardedBot):
         self.invite_url = oauth_url(
             self.user.id, permissions=Permissions(administrator=True)  # type: ignore
         )
+        self.prefix_resolver.set_user_id(self.user.id)  # type: ignore
+
+        if self.i18n_watcher:
+            self.i18n_watcher.start()
+
+        if self.db_watcher:
+            self.db_watcher.start()
+
+        # Loaded after starting the watcher to narrow the window for missed changes.
+        await self.blacklist.load()
+
+        await self.tree.set_translator(ClutterTranslator(self.i18n))
+        self.i18n.add_listener(self.tree.localize_descriptions)
+
+        if self.metrics_server:
+            await self.metrics_server.start()
 
         await self.load_extensions()
 
@@ -229,10 +222,23 @@ class ClutterBot(AutoShardedBot):
         command.cooldown_after_parsing = True
         super().add_command(command)
 
+    async def invoke(self, ctx: ClutterContext) -> None:  # type: ignore
+        name = ctx.command.qualified_name if ctx.command else "unknown"
+        token = current_command.set(name)
+
+        try:
+            with start_transaction(op="command", name=name):
+                await super().invoke(ctx)
+        finally:
+            current_command.reset(token)
+
     async def process_commands(self, message: Message) -> None:
         if message.author.bot:
             return
 
+        if not self.prefix_resolver.may_be_command(message):
+            return
+
         ctx = await self.get_context(message)
 
         if not ctx.valid:
@@ -243,32 +249,24 @@ class ClutterBot(AutoShardedBot):
 
         await self.invoke(ctx)
 
-    async def get_prefix(self, message: Message) -> list[str]:
-        if message.guild:
-            prefix = await self.db.get(
-                f"guilds.{message.guild.id}.prefix",
-                default=self.default_prefix,
-            )
-        else:
-            prefix = self.default_prefix
-
-        return [prefix, f"<@{self.user.id}>", f"<@!{self.user.id}>"]  # type: ignore
+    async def get_prefix(self, message: Message) -> str | tuple[str, ...]:
+        return await self.prefix_resolver.get_prefix(message)
 
     # noinspection PyMethodOverriding
     async def get_context(self, message: Message) -> ClutterContext:
         return await super().get_context(message, cls=ClutterContext)
 
     async def guild_check(self, guild: Guild) -> bool:
-        if await self.db.get(f"guilds.{guild.id}.blacklisted"):
+        if guild.id in self.blacklist.guilds:
             await gather(
                 guild.leave(),
-                self.db.set(f"users.{guild.owner_id}.blacklisted", True),
+                self.blacklist.add(guild.owner_id, object_type="user"),  # type: ignore
             )
             return False
-        elif await self.db.get(f"users.{guild.owner_id}.blacklisted"):
+        elif guild.owner_id in self.blacklist.users:
             await gather(
                 guild.leave(),
-                self.db.set(f"guilds.{guild.id}.blacklisted", True),
+                self.blacklist.add(guild.id, object_type="guild"),
             )
             return False
         return True  # True means the guild is safe.
@@ -277,25 +275,22 @@ class ClutterBot(AutoShardedBot):
         await gather(*(self.guild_check(guild) for guild in self.guilds))
 
     async def on_guild_join(self, guild: Guild) -> None:
-        await self.guild_check(guild)
+        if await self.guild_check(guild):
+            self.prefix_resolver.warm_later(guild.id)
 
-    async def blacklist_user(self, user: int | Object) -> bool:
-        user_id = user if isinstance(user, int) else user.id
+    async def on_guild_available(self, guild: Guild) -> None:
+        self.prefix_resolver.warm_later(guild.id)
 
-        if await self.db.get(f"users.{user_id}.blacklisted"):
-            return False
+    async def on_guild_remove(self, guild: Guild) -> None:
+        self.prefix_resolver.forget(guild.id)
 
-        await self.db.set(f"users.{user_id}.blacklisted", True)
-        return True
+    async def blacklist_user(self, user: int | Object) -> bool:
+        user_id = user if isinstance(user, int) else user.id
+        return await self.blacklist.add(user_id, object_type="user")
 
     async def unblacklist_user(self, user: int | Object) -> bool:
         user_id = user if isinstance(user, int) else user.id
-
-        if not await self.db.get(f"users.{user_id}.blacklisted"):
-            return False
-
-        await self.db.set(f"users.{user_id}.blacklisted", False)
-        return True
+        return await self.blacklist.remove(user_id, object_type="user")
 
     async def getch_member(self, guild: Guild, user_id: int) -> Member | None:
         if (member := guild.get_member(user_id)) is not None:
@@ -383,5 +378,18 @@ class ClutterBot(AutoShardedBot):
         )
 
     async def __aexit__(self, *args: Any):
+        if self.i18n_watcher:
+            await self.i18n_watcher.stop()
+
+        if self.db_watcher:
+            await self.db_watcher.stop()
+
+        if self.metrics_server:
+            await self.metrics_server.stop()
+
         await self.close()
+        await gather(self.error_dispatcher.close(), self.log_sink.close())
+        await to_thread(self.exception_reporter.close)
+        self.prefix_resolver.close()
+        await self.db.close()
         await self.session.close()
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from time import perf_counter, time
+from typing import TYPE_CHECKING, Awaitable, Callable
+
+from discord import app_commands
+from discord.ext.commands import BucketType, CommandOnCooldown, Context
+
+from ..utils import Stats
+from .errors import UserHasBeenBlacklisted, UserIsBlacklisted
+
+if TYPE_CHECKING:
+    from .bot import ClutterBot
+    from .context import ClutterContext
+    from .interaction import ClutterInteraction
+
+    Rule = Callable[
+        [ClutterContext | ClutterInteraction, "CheckSnapshot"],
+        Awaitable[bool],
+    ]
+
+__all__ = ("CheckPipeline", "CheckSnapshot", "RuleStats")
+
+
+class CheckSnapshot:
+    # Everything the rules need, gathered once per invocation.
+    __slots__ = ("author_is_owner", "guild_owner_is_owner")
+
+    def __init__(
+        self, author_is_owner: bool, guild_owner_is_owner: bool
+    ) -> None:
+        self.author_is_owner = author_is_owner
+        self.guild_owner_is_owner = guild_owner_is_owner
+
+
+@dataclass(slots=True)
+class RuleStats(Stats):
+    calls: int = 0
+    failures: int = 0
+    seconds: float = 0.0
+
+
+class CheckPipeline:
+    # The global checks of both prefix and app commands. The owner statuses
+    # are resolved once and every rule is evaluated against them in order,
+    # stopping at the first one that fails.
+    def __init__(self, bot: ClutterBot) -> None:
+        self.bot = bot
+        self.rules: dict[str, Rule] = {
+            "guild_blacklist": self.guild_blacklist,
+            "user_blacklist": self.user_blacklist,
+            "cooldown": self.cooldown,
+        }
+        self.stats = {name: RuleStats() for name in self.rules}
+
+    async def snapshot(
+        self, ctx: ClutterContext | ClutterInteraction
+    ) -> CheckSnapshot:
+        guild_owner = ctx.guild.owner if ctx.guild else None
+
+        # Both are set lookups once the owner IDs are known, there is nothing
+        # to run concurrently.
+        return CheckSnapshot(
+            await self.bot.is_owner(ctx.author),
+            await self.bot.is_owner(guild_owner) if guild_owner else False,
+        )
+
+    async def __call__(self, ctx: ClutterContext | ClutterInteraction) -> bool:
+        snapshot = await self.snapshot(ctx)
+
+        for name, rule in self.rules.items():
+            stats = self.stats[name]
+            stats.calls += 1
+            start = perf_counter()
+
+            try:
+                passed = await rule(ctx, snapshot)
+            except Exception:
+                stats.failures += 1
+                raise
+            finally:
+                stats.seconds += perf_counter() - start
+
+            if not passed:
+                stats.failures += 1
+                return False
+
+        return True
+
+    async def guild_blacklist(
+        self,
+        ctx: ClutterContext | ClutterInteraction,
+        snapshot: CheckSnapshot,
+    ) -> bool:
+        if not ctx.guild or snapshot.guild_owner_is_owner:
+            return True
+
+        return await self.bot.guild_check(ctx.guild)
+
+    async def user_blacklist(
+        self,
+        ctx: ClutterContext | ClutterInteraction,
+        snapshot: CheckSnapshot,
+    ) -> bool:
+        if (
+            ctx.author.id in self.bot.blacklist.users
+            and not snapshot.author_is_owner
+        ):
+            raise UserIsBlacklisted("You are banned from using this bot.")
+
+        return True
+
+    async def cooldown(
+        self,
+        ctx: ClutterContext | ClutterInteraction,
+        snapshot: CheckSnapshot,
+    ) -> bool:
+        if snapshot.author_is_owner:
+            return True
+
+        spam_control = self.bot.spam_control
+        author = ctx.author
+        now = (
+            ctx.message.created_at
+            if isinstance(ctx, Context)
+            else ctx.created_at
+        ).timestamp()
+
+        if (
+            retry_after := spam_control.update_rate_limit(author.id, now)
+        ) is None:
+            return True
+
+        if spam_control.strike(author.id, now) < spam_control.max_strikes:
+            if isinstance(ctx, Context):
+                raise CommandOnCooldown(
+                    spam_control.cooldown, retry_after, BucketType.user
+                )
+
+            raise app_commands.CommandOnCooldown(
+                spam_control.cooldown, retry_after
+            )
+
+        spam_control.forget(author.id)
+        await self.bot.blacklist_user(author.id)
+
+        embed = self.bot.embed.warning(
+            f"**{author}** has been blacklisted for spamming!",
+            f"Incident time: <t:{int(time())}:F>",
+        ).add_field(
+            title="User Info",
+            description=(
+                f"**Mention:** {author.mention}\n**Tag:**"
+                f" {author}\n**ID:** {author.id}"
+            ),
+        )
+        if ctx.guild:
+            channel = ctx.channel
+            embed.add_field(
+                title="Guild Info",
+                description=(
+                    f"**Name:** {ctx.guild.name}\n**ID:**"
+                    f" {ctx.guild.id}\n[Jump!](https://discord.com/channels/{ctx.guild.id})"
+                ),
+            ).add_field(
+                title="Channel Info",
+                description=f"**Mention:** {channel.mention}\n**Name:** {channel.name}\n**ID:** {channel.id}\n[Jump!]({channel.jump_url})",  # type: ignore
+            )
+
+        self.bot.log_sink.emit(embed)
+        raise UserHasBeenBlacklisted(
+            "You have been blacklisted for spamming commands."
+        )
@@ -1,14 +1,24 @@
 from __future__ import annotations
 
+from hashlib import sha256
+from json import dumps
 from typing import TYPE_CHECKING, Any, Awaitable, Callable, TypeVar
 
-from discord.app_commands import AppCommandError, CommandTree
+from discord.app_commands import (
+    AppCommandError,
+    CommandTree,
+    ContextMenu,
+    Group,
+)
+from sentry_sdk import start_transaction
 
+from ..utils import current_command
 from .interaction import ClutterInteraction
 
 if TYPE_CHECKING:
     from discord import Interaction
-    from discord.app_commands import Command, ContextMenu, Group
+    from discord.abc import Snowflake
+    from discord.app_commands import AppCommand, Command
 
     from .bot import ClutterBot
 
@@ -29,15 +39,95 @@ class ClutterCommandTree(CommandTree):
     def add_command(
         self, command: Command | Group | ContextMenu, **kwargs: Any
     ) -> None:
-        # command.name = self.bot.i18n.collect_translations(command.description)
-        # if not isinstance(command, ContextMenu):
-        #     command.description = self.bot.i18n.collect_translations(command.description)
-        # TODO: For when app command locales get implemented to discord.py.
+        self._localize_description(command)
         super().add_command(command, **kwargs)
 
+    def _localize_description(
+        self, command: Command | Group | ContextMenu
+    ) -> None:
+        # The descriptions are translation codes, which stay as the locale
+        # strings for the translator. The text of the fallback language is
+        # shown for the locales without a translation.
+        if isinstance(command, ContextMenu):
+            return
+
+        for described in (
+            (command, *command.walk_commands())
+            if isinstance(command, Group)
+            else (command,)
+        ):
+            code = (
+                described._locale_description.message
+                if described._locale_description
+                else described.description
+            )
+
+            if text := self.bot.i18n.text(self.bot.default_language, code):
+                described.description = text
+
+    def localize_descriptions(self, languages: list[str]) -> None:
+        # Listener for I18N, so changed fallback texts show up after a
+        # reload. They reach Discord with the next sync.
+        if self.bot.default_language not in languages:
+            return
+
+        for commands in (
+            self._global_commands,
+            *self._guild_commands.values(),
+        ):
+            for command in commands.values():
+                self._localize_description(command)
+
+    async def payload_hash(self, *, guild: Snowflake | None = None) -> str:
+        commands = self.get_commands(guild=guild)
+
+        if self.translator:
+            payload = [
+                await command.get_translated_payload(self, self.translator)
+                for command in commands
+            ]
+        else:
+            payload = [command.to_dict(self) for command in commands]
+
+        return sha256(
+            dumps(payload, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+    async def sync_if_changed(
+        self, *, guild: Snowflake | None = None, force: bool = False
+    ) -> list[AppCommand] | None:
+        # Syncing is heavily rate limited and uploads every command, so it's
+        # skipped when the payload is the same as the last synced one. force
+        # syncs anyway, for commands changed outside this bot. Bots sharing
+        # the database keep their own hashes.
+        key = (
+            f"meta.app_command_hashes.{self.client.application_id}"
+            f".{guild.id if guild else 'global'}"
+        )
+        try:
+            payload_hash = await self.payload_hash(guild=guild)
+
+            if not force and await self.bot.db.get(key) == payload_hash:
+                return None
+
+            commands = await self.sync(guild=guild)
+        finally:
+            self.bot.i18n.release_translations()
+
+        await self.bot.db.set(key, payload_hash)
+
+        return commands
+
     async def call(self, ctx: Interaction) -> None:
-        # Basically a 'custom' interaction class.
-        await super().call(ClutterInteraction(ctx))  # type: ignore
+        name = ctx.command.qualified_name if ctx.command else "unknown"
+        token = current_command.set(name)
+
+        try:
+            with start_transaction(op="app_command", name=name):
+                # Basically a 'custom' interaction class.
+                await super().call(ClutterInteraction(ctx))  # type: ignore
+        finally:
+            current_command.reset(token)
 
     def check(self, func: CheckType) -> CheckType:
         self.checks.append(func)
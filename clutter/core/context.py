@@ -10,6 +10,7 @@ if TYPE_CHECKING:
     from discord import Message
 
     from ..utils.embed import EmbedCreator
+    from ..utils.i18n import Translator
     from .bot import ClutterBot
 
     class ReplyEmbedCoroutine(Protocol):
@@ -57,16 +58,28 @@ class ReplyEmbedGetter:
 class ClutterContext(Context):
     bot: ClutterBot
 
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self._translators: dict[bool, Translator] = {}
+
     @property
     def reply_embed(self) -> ReplyEmbedGetter:
         return ReplyEmbedGetter(self, self.bot.embed)
 
+    async def translator(self, *, prefer_guild: bool = False) -> Translator:
+        return await self.bot.i18n.get_translator(
+            self.author.id,
+            self.guild.id if self.guild else None,
+            prefer_guild=prefer_guild,
+            cache=self._translators,
+        )
+
     async def i18n(
         self, text: str, *, prefer_guild: bool = False, **kwargs: Any
     ) -> str:
-        return (
-            await self.bot.i18n(self, text, prefer_guild=prefer_guild)
-        ).format(**kwargs)
+        return (await self.translator(prefer_guild=prefer_guild))(
+            text, **kwargs
+        )
 
     async def ok(self, value: bool) -> None:
         emojis = self.bot.config["STYLE"]["EMOJIS"]
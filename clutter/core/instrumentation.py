@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+from ..utils.i18n import Translator
+from ..utils.metrics import timed_async
+
+if TYPE_CHECKING:
+    from discord import Interaction
+
+    from ..utils.metrics import Metrics
+    from .bot import ClutterBot
+    from .context import ClutterContext
+
+__all__ = ("instrument",)
+
+DB_OPERATIONS = ("find_ids", "get", "get_many", "pull", "push", "rem", "set")
+
+
+def instrument(bot: ClutterBot, metrics: Metrics) -> None:
+    # Swaps the methods of the instances for timed ones. Nothing is wrapped
+    # unless metrics are enabled, so they cost nothing otherwise.
+    invoke = bot.invoke
+    call = bot.tree.call
+
+    async def timed_invoke(ctx: ClutterContext) -> None:
+        start = perf_counter()
+
+        try:
+            await invoke(ctx)
+        finally:
+            metrics.histogram(
+                "clutter_command_seconds",
+                command=ctx.command.qualified_name if ctx.command else "",
+                type="prefix",
+            ).observe(perf_counter() - start)
+
+    async def timed_call(ctx: Interaction) -> None:
+        start = perf_counter()
+
+        try:
+            await call(ctx)
+        finally:
+            metrics.histogram(
+                "clutter_command_seconds",
+                command=ctx.command.qualified_name if ctx.command else "",
+                type="app",
+            ).observe(perf_counter() - start)
+
+    bot.invoke = timed_invoke
+    bot.tree.call = timed_call
+    bot.process_commands = timed_async(
+        bot.process_commands,
+        metrics.histogram("clutter_process_commands_seconds"),
+    )
+
+    for operation in DB_OPERATIONS:
+        setattr(
+            bot.db,
+            operation,
+            timed_async(
+                getattr(bot.db, operation),
+                metrics.histogram("clutter_db_seconds", operation=operation),
+            ),
+        )
+
+    for operation in ("get_language", "get_translator"):
+        setattr(
+            bot.i18n,
+            operation,
+            timed_async(
+                getattr(bot.i18n, operation),
+                metrics.histogram("clutter_i18n_seconds", operation=operation),
+            ),
+        )
+
+    render = metrics.histogram("clutter_i18n_seconds", operation="render")
+
+    # Commands render through the translators they get, not I18N itself.
+    class TimedTranslator(Translator):
+        __slots__ = ()
+
+        def __call__(self, code: str, **kwargs: Any) -> str:
+            start = perf_counter()
+
+            try:
+                return super().__call__(code, **kwargs)
+            finally:
+                render.observe(perf_counter() - start)
+
+    bot.i18n.translator_class = TimedTranslator
+
+    metrics.add_collector("clutter_cache", bot.db.stats.to_dict)
+    metrics.add_collector(
+        "clutter_negative_cache", bot.db.negative_stats.to_dict
+    )
+    metrics.add_collector("clutter_prefix", bot.prefix_resolver.stats.to_dict)
+    metrics.add_collector(
+        "clutter_spam_control",
+        lambda: {
+            **bot.spam_control.stats.to_dict(),
+            "tracked": len(bot.spam_control),
+        },
+    )
+    metrics.add_collector(
+        "clutter_checks",
+        lambda: {
+            f"{rule}_{key}": value
+            for rule, stats in bot.check_pipeline.stats.items()
+            for key, value in stats.to_dict().items()
+        },
+    )
+    metrics.add_collector(
+        "clutter_error_dispatcher", bot.error_dispatcher.stats.to_dict
+    )
+    metrics.add_collector("clutter_log_sink", bot.log_sink.stats.to_dict)
+    metrics.add_collector(
+        "clutter_webhook_limiter", bot.webhook_limiter.stats.to_dict
+    )
+    metrics.add_collector(
+        "clutter_exception_reporter", bot.exception_reporter.stats.to_dict
+    )
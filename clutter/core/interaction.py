@@ -8,6 +8,7 @@ if TYPE_CHECKING:
     from discord import Interaction
 
     from ..utils.embed import EmbedCreator
+    from ..utils.i18n import Translator
     from .bot import ClutterBot
 
     class RespondEmbedCoroutine(Protocol):
@@ -61,6 +62,7 @@ class ClutterInteraction:
         self.__ctx = ctx
         self.bot = self.client
         self.author = self.user
+        self._translators: dict[bool, Translator] = {}
 
     def __getattr__(self, item: str) -> Any:
         return getattr(self.__ctx, item)
@@ -69,12 +71,20 @@ class ClutterInteraction:
     def reply_embed(self) -> RespondEmbedGetter:
         return RespondEmbedGetter(self, self.bot.embed)
 
+    async def translator(self, *, prefer_guild: bool = False) -> Translator:
+        return await self.bot.i18n.get_translator(
+            self.author.id,
+            self.guild.id if self.guild else None,
+            prefer_guild=prefer_guild,
+            cache=self._translators,
+        )
+
     async def i18n(
         self, text: str, *, prefer_guild: bool = False, **kwargs: Any
     ) -> str:
-        return (
-            await self.bot.i18n(self, text, prefer_guild=prefer_guild)
-        ).format(**kwargs)
+        return (await self.translator(prefer_guild=prefer_guild))(
+            text, **kwargs
+        )
 
     async def reply(self, *args: Any, **kwargs: Any) -> None:
         await self.response.send_message(*args, **kwargs)
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import logging
+from asyncio import Task, create_task, sleep
+from dataclasses import dataclass
+from re import Pattern, compile
+from typing import TYPE_CHECKING, Any
+
+from pymongo.errors import PyMongoError
+
+from ..utils import Stats
+
+if TYPE_CHECKING:
+    from discord import Message
+
+    from ..utils.db import CachedMongoManager
+
+__all__ = ("PrefixResolver", "PrefixStats")
+
+log = logging.getLogger(__name__)
+
+# Returned when nothing matched. discord.py accepts any sequence of prefixes,
+# and sharing an empty tuple avoids building a list for every message.
+NO_PREFIX: tuple[str, ...] = ()
+
+
+@dataclass(slots=True)
+class PrefixStats(Stats):
+    fetched: int = 0
+    filtered: int = 0
+    passed: int = 0
+
+
+class PrefixResolver:
+    # The prefixes of the guilds are kept in memory, warmed in batches as the
+    # guilds become available and updated from the change stream. Resolving
+    # the prefix of a message is then a dict lookup and a startswith.
+    def __init__(
+        self,
+        db: CachedMongoManager,
+        default_prefix: str,
+        *,
+        warm_delay: float = 1.0,
+    ) -> None:
+        self._db = db
+        self._warm_delay = warm_delay
+        self._to_warm: set[int] = set()
+        self._warm_task: Task | None = None
+        self._mention: Pattern[str] | None = None
+        self.default_prefix = default_prefix
+        self.prefixes: dict[int, str] = {}
+        self.stats = PrefixStats()
+
+    def set_user_id(self, user_id: int) -> None:
+        self._mention = compile(f"<@!?{user_id}>")
+
+    def warm_later(self, guild_id: int) -> None:
+        # Guilds become available one by one while connecting, so they're
+        # collected and fetched with a single query.
+        if guild_id in self.prefixes:
+            return
+
+        self._to_warm.add(guild_id)
+
+        if self._warm_task is None:
+            self._warm_task = create_task(self._warm_later())
+
+    async def _warm_later(self) -> None:
+        await sleep(self._warm_delay)
+        self._warm_task = None
+
+        guild_ids, self._to_warm = self._to_warm, set()
+
+        try:
+            await self.warm(guild_ids)
+        except PyMongoError:
+            # The guilds left out are fetched on their first message instead.
+            log.exception("Warming the guild prefixes failed.")
+
+    async def warm(self, guild_ids: set[int]) -> None:
+        if not (
+            missing := [
+                guild_id
+                for guild_id in guild_ids
+                if guild_id not in self.prefixes
+            ]
+        ):
+            return
+
+        prefixes = await self._db.get_many(
+            [f"guilds.{guild_id}.prefix" for guild_id in missing],
+            default=self.default_prefix,
+        )
+
+        for guild_id, prefix in zip(missing, prefixes):
+            # A write might have landed while fetching.
+            self.prefixes.setdefault(guild_id, prefix)
+
+    def close(self) -> None:
+        if self._warm_task is not None:
+            self._warm_task.cancel()
+            self._warm_task = None
+
+    def forget(self, guild_id: int) -> None:
+        self.prefixes.pop(guild_id, None)
+        self._to_warm.discard(guild_id)
+
+    async def fetch(self, guild_id: int) -> str:
+        self.stats.fetched += 1
+        prefix = await self._db.get(
+            f"guilds.{guild_id}.prefix", default=self.default_prefix
+        )
+        return self.prefixes.setdefault(guild_id, prefix)
+
+    def get_cached(self, message: Message) -> str | None:
+        # None means the guild hasn't been warmed yet and fetch is needed.
+        if message.guild is None:
+            return self.default_prefix
+
+        return self.prefixes.get(message.guild.id)
+
+    def match(self, content: str, prefix: str) -> str | None:
+        if content.startswith(prefix):
+            return prefix
+
+        if (
+            self._mention is not None
+            and content.startswith("<@")
+            and (mention := self._mention.match(content))
+        ):
+            return mention.group()
+
+        return None
+
+    def may_be_command(self, message: Message) -> bool:
+        # Checked before building a context, which most messages never need.
+        # Guilds that aren't warmed yet pass, get_prefix fetches their prefix.
+        if (prefix := self.get_cached(message)) is not None and self.match(
+            message.content, prefix
+        ) is None:
+            self.stats.filtered += 1
+            return False
+
+        self.stats.passed += 1
+        return True
+
+    async def get_prefix(self, message: Message) -> str | tuple[str, ...]:
+        if (prefix := self.get_cached(message)) is None:
+            prefix = await self.fetch(message.guild.id)  # type: ignore
+
+        return self.match(message.content, prefix) or NO_PREFIX
+
+    def handle_change(self, change: dict[str, Any]) -> None:
+        # Listener for ChangeWatcher, picks up prefixes set by other processes.
+        if change["ns"]["coll"] != "guilds":
+            return
+
+        guild_id = int(change["documentKey"]["_id"])
+
+        if guild_id not in self.prefixes:
+            return
+
+        match change["operationType"]:
+            case "update":
+                description = change["updateDescription"]
+
+                if "prefix" in description.get("updatedFields", {}):
+                    prefix = description["updatedFields"]["prefix"]
+                elif "prefix" in description.get("removedFields", []):
+                    prefix = self.default_prefix
+                else:
+                    return
+
+            case "insert" | "replace":
+                prefix = change.get("fullDocument", {}).get(
+                    "prefix", self.default_prefix
+                )
+
+            case _:
+                prefix = self.default_prefix
+
+        self.prefixes[guild_id] = prefix
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from discord.ext.commands import Cooldown
+
+from ..utils import Stats
+
+__all__ = ("SpamControl", "SpamControlStats")
+
+
+class _UserState:
+    __slots__ = ("count", "strikes", "strikes_reset_at", "window_start")
+
+    def __init__(self, now: float) -> None:
+        self.count = 0
+        self.strikes = 0
+        self.strikes_reset_at = now
+        self.window_start = now
+
+
+@dataclass(slots=True)
+class SpamControlStats(Stats):
+    evictions: int = 0
+    rate_limited: int = 0
+    strikes: int = 0
+    swept: int = 0
+
+
+class SpamControl:
+    # Rate limits commands per user and counts how often a user hits the
+    # limit. Strikes decay after strike_window seconds without a new one, and
+    # a user is only tracked while their window or strikes are live. Users are
+    # kept in the order they were last seen, so expired ones are swept from
+    # the front and the least recently seen one is dropped past max_users.
+    def __init__(
+        self,
+        rate: int,
+        per: float,
+        *,
+        max_strikes: int = 3,
+        strike_window: float = 600.0,
+        max_users: int = 50_000,
+        sweep_interval: float = 60.0,
+    ) -> None:
+        self.cooldown = Cooldown(rate, per)
+        self.max_strikes = max_strikes
+        self._rate = rate
+        self._per = per
+        self._strike_window = strike_window
+        self._max_users = max_users
+        self._sweep_interval = sweep_interval
+        self._next_sweep = 0.0
+        self._users: OrderedDict[int, _UserState] = OrderedDict()
+        self.stats = SpamControlStats()
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def _expired(self, state: _UserState, now: float) -> bool:
+        return (
+            now >= state.window_start + self._per
+            and now >= state.strikes_reset_at
+        )
+
+    def _state(self, user_id: int, now: float) -> _UserState:
+        if (state := self._users.get(user_id)) is not None:
+            self._users.move_to_end(user_id)
+            return state
+
+        self.sweep(now)
+
+        if len(self._users) >= self._max_users:
+            self._users.popitem(last=False)
+            self.stats.evictions += 1
+
+        state = self._users[user_id] = _UserState(now)
+        return state
+
+    def sweep(self, now: float) -> None:
+        users = self._users
+
+        # The least recently seen users expire first, most of the time.
+        while users and self._expired(next(iter(users.values())), now):
+            users.popitem(last=False)
+            self.stats.swept += 1
+
+        if now < self._next_sweep:
+            return
+
+        self._next_sweep = now + self._sweep_interval
+
+        for user_id in [
+            user_id
+            for user_id, state in users.items()
+            if self._expired(state, now)
+        ]:
+            del users[user_id]
+            self.stats.swept += 1
+
+    def update_rate_limit(self, user_id: int, now: float) -> float | None:
+        # Returns how long the user has to wait, None if they don't.
+        state = self._state(user_id, now)
+
+        if now >= state.window_start + self._per:
+            state.window_start = now
+            state.count = 0
+
+        state.count += 1
+
+        if state.count <= self._rate:
+            return None
+
+        self.stats.rate_limited += 1
+        return state.window_start + self._per - now
+
+    def strike(self, user_id: int, now: float) -> int:
+        state = self._state(user_id, now)
+
+        if now >= state.strikes_reset_at:
+            state.strikes = 0
+
+        state.strikes += 1
+        state.strikes_reset_at = now + self._strike_window
+        self.stats.strikes += 1
+
+        return state.strikes
+
+    def forget(self, user_id: int) -> None:
+        self._users.pop(user_id, None)
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from discord.app_commands import Translator
+
+if TYPE_CHECKING:
+    from discord import Locale
+    from discord.app_commands import TranslationContextTypes, locale_str
+
+    from ..utils.i18n import I18N
+
+__all__ = ("ClutterTranslator",)
+
+
+class ClutterTranslator(Translator):
+    # App command strings are translation codes. Their localizations come from
+    # the reverse index of the I18N, which is built once per sync, so a sync
+    # doesn't go through the language tables for each locale.
+    def __init__(self, i18n: I18N) -> None:
+        self.i18n = i18n
+
+    async def translate(
+        self,
+        string: locale_str,
+        locale: Locale,
+        context: TranslationContextTypes,
+    ) -> str | None:
+        return self.i18n.localize(string.message, locale.value)
@@ -1,4 +1,8 @@
-from . import color, db, embed, i18n
+from . import color, db, embed, i18n, webhook
+from .batcher import *
 from .format_as_list import *
-from .run_in_executor import *
+from .metrics import *
+from .profiler import *
+from .stats import *
+from .telemetry import *
 from .text_file import *
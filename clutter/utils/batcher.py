@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import logging
+from abc import ABC, abstractmethod
+from asyncio import Lock, Task, create_task, sleep
+
+__all__ = ("Batcher",)
+
+log = logging.getLogger(__name__)
+
+
+class Batcher(ABC):
+    # Collects work and flushes it flush_interval seconds after the first
+    # item, and once more on close. Subclasses implement _flush, which runs
+    # under a lock so flushes never overlap.
+    def __init__(self, *, flush_interval: float) -> None:
+        self._flush_interval = flush_interval
+        self._lock = Lock()
+        self._timer: Task | None = None
+
+    def _schedule(self) -> None:
+        if self._timer is None:
+            self._timer = create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await sleep(self._flush_interval)
+        self._timer = None
+
+        try:
+            await self.flush()
+        except Exception:
+            log.exception("Flushing %s failed.", type(self).__name__)
+
+    @abstractmethod
+    async def _flush(self) -> None:
+        ...
+
+    async def flush(self) -> None:
+        async with self._lock:
+            await self._flush()
+
+    async def close(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        await self.flush()
@@ -1,3 +1,7 @@
+from .cache import *
 from .cacher import *
 from .manager import *
 from .misc import *
+from .policies import *
+from .watcher import *
+from .write_behind import *
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from time import monotonic
+from typing import Any, Iterator
+
+# noinspection PyPackageRequirements
+from lru import LRU
+
+from ..stats import Stats
+from .policies import TinyLFU, TTLPolicy, estimate_size
+
+__all__ = ("ABSENT", "CacheStats", "PathCache")
+
+
+class _Absent:
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "ABSENT"
+
+    def __bool__(self) -> bool:
+        return False
+
+
+# Cached in place of paths and documents that don't exist in the database.
+ABSENT: Any = _Absent()
+
+
+class _Node:
+    __slots__ = ("children", "key", "parent", "segment")
+
+    def __init__(self, parent: _Node | None = None, segment: str = "") -> None:
+        self.children: dict[str, _Node] = {}
+        self.key: str | None = None
+        self.parent = parent
+        self.segment = segment
+
+
+class _Entry:
+    __slots__ = ("expires_at", "size", "value")
+
+    def __init__(
+        self, value: Any, expires_at: float | None, size: int
+    ) -> None:
+        self.expires_at = expires_at
+        self.size = size
+        self.value = value
+
+
+@dataclass(slots=True)
+class CacheStats(Stats):
+    coalesced: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    filtered: int = 0
+    hits: int = 0
+    loads: int = 0
+    misses: int = 0
+    rejections: int = 0
+
+
+class PathCache:
+    # The trie mirrors the keys of the LRU, so invalidating a path only visits
+    # its cached ancestors and descendants instead of scanning every key.
+    def __init__(
+        self,
+        max_items: int,
+        *,
+        ttl: TTLPolicy | None = None,
+        max_bytes: int | None = None,
+        admission: TinyLFU | None = None,
+    ) -> None:
+        self._items = LRU(max_items, callback=self._on_evict)
+        self._root = _Node()
+        self._ttl = ttl
+        self._max_bytes = max_bytes
+        self._admission = admission
+        self.bytes = 0
+        self.stats = CacheStats()
+
+    def __contains__(self, key: str) -> bool:
+        return self._entry(key) is not None
+
+    def __getitem__(self, key: str) -> Any:
+        if (entry := self._entry(key)) is None:
+            raise KeyError(key)
+
+        return entry.value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        size = estimate_size(value) if self._max_bytes is not None else 0
+
+        if self._max_bytes is not None and size > self._max_bytes:
+            self.stats.rejections += 1
+            self.pop(key)
+            return
+
+        if key in self._items:
+            self.bytes -= self._items[key].size
+        else:
+            if (
+                self._admission is not None
+                and len(self._items) >= self._items.get_size()
+                and not self._admission.admit(
+                    key, self._items.peek_last_item()[0]  # type: ignore
+                )
+            ):
+                self.stats.rejections += 1
+                return
+
+            self._index(key)
+
+        ttl = self._ttl.get_ttl(key) if self._ttl is not None else None
+
+        self._items[key] = _Entry(
+            value, None if ttl is None else monotonic() + ttl, size
+        )
+        self.bytes += size
+
+        if self._max_bytes is not None:
+            while self.bytes > self._max_bytes:
+                victim, entry = self._items.peek_last_item()  # type: ignore
+                del self._items[victim]
+                self._on_evict(victim, entry)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._items.keys())
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if self._admission is not None:
+            self._admission.record(key)
+
+        if (entry := self._entry(key)) is None:
+            self.stats.misses += 1
+            return default
+
+        self.stats.hits += 1
+        return entry.value
+
+    def peek_items(self) -> list[tuple[str, Any]]:
+        # Unlike get, this doesn't touch the recency order or the stats.
+        now = monotonic()
+
+        return [
+            (key, entry.value)
+            for key, entry in self._items.items()
+            if entry.expires_at is None or entry.expires_at > now
+        ]
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        if (entry := self._items.pop(key, None)) is None:
+            return default
+
+        self.bytes -= entry.size
+        self._unindex(key)
+        return entry.value
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._root = _Node()
+        self.bytes = 0
+
+    def invalidate(self, path: str) -> int:
+        removed = 0
+        node = self._root
+
+        for segment in path.split("."):
+            if (child := node.children.get(segment)) is None:
+                self._prune(node)
+                return removed
+
+            node = child
+
+            if node.key is not None:
+                removed += self._drop(node)
+
+        stack = list(node.children.values())
+
+        while stack:
+            child = stack.pop()
+            stack.extend(child.children.values())
+
+            if child.key is not None:
+                removed += self._drop(child)
+
+        node.children.clear()
+        self._prune(node)
+
+        return removed
+
+    def _entry(self, key: str) -> _Entry | None:
+        if (entry := self._items.get(key)) is None:
+            return None
+
+        if entry.expires_at is not None and entry.expires_at <= monotonic():
+            self.stats.expirations += 1
+            self.pop(key)
+            return None
+
+        return entry
+
+    def _drop(self, node: _Node) -> int:
+        if (
+            node.key is not None
+            and (entry := self._items.pop(node.key, None)) is not None
+        ):
+            self.bytes -= entry.size
+
+        node.key = None
+        return 1
+
+    def _index(self, key: str) -> None:
+        node = self._root
+
+        for segment in key.split("."):
+            if (child := node.children.get(segment)) is None:
+                child = node.children[segment] = _Node(node, segment)
+
+            node = child
+
+        node.key = key
+
+    def _unindex(self, key: str) -> None:
+        node = self._root
+
+        for segment in key.split("."):
+            if (child := node.children.get(segment)) is None:
+                return
+
+            node = child
+
+        node.key = None
+        self._prune(node)
+
+    def _prune(self, node: _Node) -> None:
+        while (
+            node.parent is not None and node.key is None and not node.children
+        ):
+            del node.parent.children[node.segment]
+            node = node.parent
+
+    def _on_evict(self, key: str, entry: _Entry) -> None:
+        self.stats.evictions += 1
+        self.bytes -= entry.size
+        self._unindex(key)
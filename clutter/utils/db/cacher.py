@@ -1,14 +1,31 @@
 from __future__ import annotations
 
-from typing import Any
-
-# noinspection PyPackageRequirements
-from lru import LRU
+from asyncio import Task, create_task, current_task, gather, shield
+from copy import deepcopy
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Iterable,
+)
 
+from .cache import ABSENT, PathCache
 from .manager import MongoManager
+from .misc import find_in_nested_dict, maybe_int, set_in_nested_dict
+from .policies import BloomFilter, TinyLFU, TTLPolicy
+from .write_behind import WriteBehindQueue
+
+if TYPE_CHECKING:
+    # noinspection PyProtectedMember
+    from motor.motor_asyncio import AsyncIOMotorCollection
+
 
 __all__ = ("CachedMongoManager",)
 
+_MISSING = object()
+
 
 class CachedMongoManager(MongoManager):
     def __init__(
@@ -18,51 +35,463 @@ class CachedMongoManager(MongoManager):
         *,
         database: str,
         max_items: int,
+        cache_documents: bool = False,
+        ttl: TTLPolicy | None = None,
+        max_bytes: int | None = None,
+        admission: TinyLFU | None = None,
+        negative_ttl: float = 30.0,
+        negative_max_items: int | None = None,
+        write_behind: bool = False,
+        flush_interval: float = 1.0,
+        flush_size: int = 500,
     ) -> None:
-        self._cache = LRU(max_items)
+        self._cache = PathCache(
+            max_items, ttl=ttl, max_bytes=max_bytes, admission=admission
+        )
+        # Paths and documents that don't exist are kept apart with a shorter
+        # TTL, so misses can't push out real data.
+        self._negative = PathCache(
+            negative_max_items or max_items, ttl=TTLPolicy(negative_ttl)
+        )
+        self._bloom_filters: dict[str, BloomFilter] = {}
+        self._cache_documents = cache_documents
+        self._pending: dict[str, Task] = {}
+        self.stats = self._cache.stats
+        self.negative_stats = self._negative.stats
         super().__init__(connect_url, port, database=database)
 
-    def uncache(self, key: str | list[str], *, match: bool = True) -> None:
+        # Writes are batched and flushed later, reads overlay the pending ones.
+        self._write_behind = (
+            WriteBehindQueue(
+                self._db,
+                flush_interval=flush_interval,
+                flush_size=flush_size,
+                on_flushed=self._on_flushed,
+            )
+            if write_behind
+            else None
+        )
+
+    @staticmethod
+    def _split_path(path: str) -> tuple[str, str]:
+        # Splits the path to the document key ("collection._id") and the key inside the document.
+        parts = path.split(".", 2)
+
+        if len(parts) < 2:
+            raise ValueError(
+                "Path must be at least 2 elements long: Collection and _id."
+            )
+
+        return ".".join(parts[:2]), next(iter(parts[2:]), "")
+
+    def uncache(self, key: str | list[str]) -> None:
+        # Drops the path along with every cached parent and child of it.
         if isinstance(key, list):
             for single_key in key:
-                self.uncache(single_key, match=match)
+                self.uncache(single_key)
+
+        else:
+            self._cache.invalidate(key)
+            self._negative.invalidate(key)
+            self._detach_loads([key])
+
+    async def load_bloom_filter(
+        self,
+        collection: str,
+        *,
+        active: Callable[[], bool],
+        error_rate: float = 0.01,
+    ) -> bool:
+        # Only safe while inserts from other processes reach mark_existing,
+        # so nothing is registered unless active says a change stream is
+        # open. Returns whether the filter is in use.
+        count = await self._db[collection].estimated_document_count()
+
+        if not active():
+            return False
+
+        bloom = BloomFilter(count * 2 + 1000, error_rate=error_rate)
+        # Registered before loading so writes during the scan aren't missed.
+        self._bloom_filters[collection] = bloom
+
+        async for document in self._db[collection].find({}, {"_id": 1}):
+            bloom.add(str(document["_id"]))
+
+        # Dropped during the scan, it may have missed inserts.
+        if self._bloom_filters.get(collection) is not bloom:
+            return False
 
-        elif match:
-            del self._cache[key]
+        bloom.ready = True
+        return True
 
+    def drop_bloom_filters(self) -> None:
+        self._bloom_filters.clear()
+
+    def mark_existing(self, collection: str, _id: str | int) -> None:
+        if (bloom := self._bloom_filters.get(collection)) is not None:
+            bloom.add(str(_id))
+
+    def _filtered(self, path: str) -> bool:
+        collection, _id, *_ = path.split(".", 2)
+
+        if (
+            (bloom := self._bloom_filters.get(collection)) is not None
+            and bloom.ready
+            and _id not in bloom
+        ):
+            self.stats.filtered += 1
+            return True
+
+        return False
+
+    def _cached(self, key: str) -> Any:
+        if (value := self._cache.get(key, _MISSING)) is _MISSING:
+            value = self._negative.get(key, _MISSING)
+
+        return value
+
+    def _on_flushed(self, keys: list[str], succeeded: bool) -> None:
+        if succeeded:
+            self._detach_loads(keys)
         else:
-            for ikey in self._cache.keys():
-                if ikey.startswith(key):
-                    del self._cache[ikey]
+            self.uncache(keys)
 
-    async def get(self, path: str, *, default: Any = None) -> Any:
-        if path in self._cache:
-            return self._cache[path]
+    def _detach_loads(self, keys: list[str]) -> None:
+        # Loads that are still running for an affected path would cache
+        # stale data, so they are detached and left to finish uncached.
+        for key in keys:
+            for pending in [
+                pending
+                for pending in self._pending
+                if pending == key
+                or pending.startswith(f"{key}.")
+                or key.startswith(f"{pending}.")
+            ]:
+                del self._pending[pending]
+
+    def _load(
+        self, key: str, loader: Callable[[], Awaitable[Any]]
+    ) -> Awaitable[Any]:
+        # Concurrent misses on the same key share a single database query.
+        if (task := self._pending.get(key)) is not None:
+            self.stats.coalesced += 1
+        else:
+            task = self._pending[key] = create_task(
+                self._load_into_cache(key, loader)
+            )
+
+        return shield(task)
+
+    async def _load_into_cache(
+        self, key: str, loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        task = current_task()
+        self.stats.loads += 1
+
+        try:
+            value = await loader()
+        except BaseException:
+            if self._pending.get(key) is task:
+                del self._pending[key]
 
-        value = await super().get(path, default=default)
+            raise
 
-        self._cache[path] = value
+        if self._pending.get(key) is task:
+            del self._pending[key]
+
+            if value is ABSENT:
+                self._negative[key] = value
+            else:
+                self._cache[key] = value
 
         return value
 
+    async def get(self, path: str, *, default: Any = None) -> Any:
+        if self._filtered(path):
+            return default
+
+        if self._cache_documents:
+            return await self._get_from_document(path, default=default)
+
+        if (value := self._cached(path)) is _MISSING:
+            value = await self._load(path, lambda: self._fetch_path(path))
+
+        return default if value is ABSENT else value
+
+    async def _fetch_path(self, path: str) -> Any:
+        if self._write_behind is None:
+            return await MongoManager.get(self, path, default=ABSENT)
+
+        collection, _id, key = self._parse_path(path)
+
+        document = self._write_behind.apply(
+            collection.name,
+            _id,
+            await collection.find_one(
+                {"_id": _id}, {"_id": 0, key: 1} if key else None
+            ),
+        )
+
+        if not key:
+            return ABSENT if document is None else document
+
+        return find_in_nested_dict(document, key, default=ABSENT)
+
+    async def _fetch_document(self, collection: str, _id: Any) -> Any:
+        document = await self._db[collection].find_one({"_id": _id})
+
+        if self._write_behind is not None:
+            document = self._write_behind.apply(collection, _id, document)
+
+        return ABSENT if document is None else document
+
+    async def _get_from_document(
+        self, path: str, *, default: Any = None
+    ) -> Any:
+        document_key, key = self._split_path(path)
+
+        if (document := self._cached(document_key)) is _MISSING:
+            collection, _id = document_key.split(".")
+            document = await self._load(
+                document_key,
+                lambda: self._fetch_document(collection, maybe_int(_id)),
+            )
+
+        if document is ABSENT:
+            return default
+
+        # Copied, so callers mutating the result can't change the cache.
+        if not key:
+            return deepcopy(document)
+
+        return deepcopy(find_in_nested_dict(document, key, default=default))
+
+    async def _find_many(
+        self,
+        collection: AsyncIOMotorCollection,
+        ids: list[str | int],
+        projection: dict[str, int] | None,
+    ) -> dict[str | int, Any]:
+        documents = await super()._find_many(collection, ids, projection)
+
+        if self._write_behind is not None:
+            for _id in ids:
+                document = self._write_behind.apply(
+                    collection.name, _id, documents.get(_id)
+                )
+
+                if document is not None:
+                    documents[_id] = document
+
+        return documents
+
+    async def get_many(
+        self, paths: Iterable[str], *, default: Any = None
+    ) -> list[Any]:
+        paths = list(paths)
+        wanted = [path for path in paths if not self._filtered(path)]
+
+        if not self._cache_documents:
+            values = await self._get_many_cached(wanted, self._fetch_paths)
+
+            return [
+                default
+                if (value := values.get(path, ABSENT)) is ABSENT
+                else value
+                for path in paths
+            ]
+
+        documents = await self._get_many_cached(
+            [self._split_path(path)[0] for path in wanted],
+            self._fetch_documents,
+        )
+        values = []
+
+        for path in paths:
+            document_key, key = self._split_path(path)
+            document = documents.get(document_key, ABSENT)
+
+            if document is ABSENT:
+                values.append(default)
+            elif key:
+                values.append(
+                    deepcopy(
+                        find_in_nested_dict(document, key, default=default)
+                    )
+                )
+            else:
+                values.append(deepcopy(document))
+
+        return values
+
+    async def _get_many_cached(
+        self,
+        keys: list[str],
+        loader: Callable[[list[str]], Coroutine[Any, Any, dict[str, Any]]],
+    ) -> dict[str, Any]:
+        values = {}
+        uncached = []
+
+        for key in dict.fromkeys(keys):
+            if (value := self._cached(key)) is not _MISSING:
+                values[key] = value
+            else:
+                uncached.append(key)
+
+        if not uncached:
+            return values
+
+        # A single query loads every key that isn't being loaded already,
+        # while each key still gets its own load for others to join.
+        if missing := [key for key in uncached if key not in self._pending]:
+            batch = create_task(loader(missing))
+        else:
+            batch = None
+
+        async def take(key: str) -> Any:
+            return (await shield(batch))[key]  # type: ignore
+
+        values.update(
+            zip(
+                uncached,
+                await gather(
+                    *(
+                        self._load(key, lambda key=key: take(key))
+                        for key in uncached
+                    )
+                ),
+            )
+        )
+
+        return values
+
+    async def _fetch_paths(self, paths: list[str]) -> dict[str, Any]:
+        return dict(
+            zip(
+                paths,
+                await MongoManager.get_many(self, paths, default=ABSENT),
+            )
+        )
+
+    async def _fetch_documents(
+        self, document_keys: list[str]
+    ) -> dict[str, Any]:
+        grouped: dict[str, list[str | int]] = {}
+
+        for document_key in document_keys:
+            collection, _id = document_key.split(".")
+            grouped.setdefault(collection, []).append(maybe_int(_id))
+
+        documents = {}
+
+        for collection, ids in grouped.items():
+            found = await self._find_many(self._db[collection], ids, None)
+
+            for _id in ids:
+                documents[f"{collection}.{_id}"] = found.get(_id, ABSENT)
+
+        return documents
+
     async def set(self, path: str, value: Any) -> None:
-        await super().set(path, value)
-        self.uncache(path)
+        collection, _id, _ = self._parse_path(path)
+        self.mark_existing(collection.name, _id)
+
+        if self._write_behind is None:
+            await super().set(path, value)
+        else:
+            collection, _id, key = self._parse_path(path)
+
+            if key:
+                await self._write_behind.set(collection.name, _id, key, value)
+            elif isinstance(value, dict):
+                for key, item in value.items():
+                    await self._write_behind.set(
+                        collection.name, _id, key, item
+                    )
+            else:
+                raise ValueError(
+                    "The value must be a dictionary if whole document is"
+                    " wanted to be updated."
+                )
+
+        if not self._cache_documents:
+            self.uncache(path)
+            return
+
+        document_key, key = self._split_path(path)
+
+        # Keep the cached document in sync instead of refetching it on the next read.
+        if document_key in self._cache:
+            document = self._cache[document_key]
+        elif self._negative.pop(document_key, _MISSING) is ABSENT:
+            # The upsert created the document.
+            document = {"_id": maybe_int(document_key.split(".")[1])}
+        else:
+            self.uncache(path)
+            return
+
+        # Copied, so the caller mutating its value can't change the cache.
+        if key:
+            set_in_nested_dict(document, key, deepcopy(value))
+        else:
+            document.update(deepcopy(value))
+
+        # Storing it again refreshes the TTL and the size estimate.
+        self._cache[document_key] = document
+        self._detach_loads([document_key])
 
     async def push(
         self, path: str, value: Any, *, allow_duplicates: bool = True
     ) -> bool:
-        res = await super().push(
-            path, value, allow_duplicates=allow_duplicates
-        )
+        collection, _id, _ = self._parse_path(path)
+        self.mark_existing(collection.name, _id)
+
+        if self._write_behind is None:
+            res = await super().push(
+                path, value, allow_duplicates=allow_duplicates
+            )
+        else:
+            collection, _id, key = self._parse_path(path)
+
+            if key and allow_duplicates:
+                await self._write_behind.push(collection.name, _id, key, value)
+                res = True
+            else:
+                # The result depends on the current state of the document.
+                await self._write_behind.flush()
+                res = await super().push(
+                    path, value, allow_duplicates=allow_duplicates
+                )
+
         self.uncache(path)
         return res
 
     async def pull(self, path: str, value: Any) -> bool:
+        if self._write_behind is not None:
+            await self._write_behind.flush()
+
         res = await super().pull(path, value)
         self.uncache(path)
         return res
 
     async def rem(self, path: str) -> None:
-        await super().rem(path)
+        if self._write_behind is not None and path.count(".") > 1:
+            collection, _id, key = self._parse_path(path)
+            await self._write_behind.unset(collection.name, _id, key)
+        else:
+            if self._write_behind is not None:
+                await self._write_behind.flush()
+
+            await super().rem(path)
+
         self.uncache(path)
+
+    async def flush(self) -> None:
+        if self._write_behind is not None:
+            await self._write_behind.flush()
+
+    async def close(self) -> None:
+        if self._write_behind is not None:
+            await self._write_behind.close()
+
+        await super().close()
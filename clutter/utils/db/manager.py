@@ -1,11 +1,11 @@
 from __future__ import annotations
 
 import time
-from typing import TYPE_CHECKING, Any, Literal, overload
+from typing import TYPE_CHECKING, Any, Iterable, Literal, overload
 
 from motor.motor_asyncio import AsyncIOMotorClient
 
-from .misc import create_nested_dict, find_in_nested_dict, maybe_int
+from .misc import find_in_nested_dict, maybe_int
 
 if TYPE_CHECKING:
     # noinspection PyProtectedMember
@@ -59,6 +59,9 @@ class MongoManager:
 
         return ts
 
+    async def close(self) -> None:
+        self._client.close()
+
     async def get(self, path: str, *, default: Any = None) -> Any:
         collection, _id, path = self._parse_path(path)
 
@@ -70,6 +73,70 @@ class MongoManager:
             default=default,
         )
 
+    async def find_ids(
+        self, collection: str, query: dict[str, Any]
+    ) -> list[str | int]:
+        return [
+            document["_id"]
+            async for document in self._db[collection].find(query, {"_id": 1})
+        ]
+
+    async def _find_many(
+        self,
+        collection: AsyncIOMotorCollection,
+        ids: list[str | int],
+        projection: dict[str, int] | None,
+    ) -> dict[str | int, Any]:
+        documents = {}
+
+        for start in range(0, len(ids), 1000):
+            async for document in collection.find(
+                {"_id": {"$in": ids[start : start + 1000]}}, projection
+            ):
+                documents[document["_id"]] = document
+
+        return documents
+
+    async def get_many(
+        self, paths: Iterable[str], *, default: Any = None
+    ) -> list[Any]:
+        parsed = [self._parse_path(path) for path in paths]
+        grouped: dict[str, tuple[AsyncIOMotorCollection, dict, set[str]]] = {}
+
+        for collection, _id, path in parsed:
+            _, ids, keys = grouped.setdefault(
+                collection.name, (collection, {}, set())
+            )
+            ids[_id] = None
+            keys.add(path)
+
+        documents: dict[tuple[str, str | int], Any] = {}
+
+        for name, (collection, ids, keys) in grouped.items():
+            if "" in keys:
+                projection = None
+            else:
+                # Mongo rejects projections where one path contains another.
+                projection = {
+                    key: 1
+                    for key in keys
+                    if not any(key.startswith(f"{other}.") for other in keys)
+                }
+
+            for _id, document in (
+                await self._find_many(collection, list(ids), projection)
+            ).items():
+                documents[name, _id] = document
+
+        return [
+            find_in_nested_dict(
+                documents.get((collection.name, _id)), path, default=default
+            )
+            if path
+            else documents.get((collection.name, _id), default)
+            for collection, _id, path in parsed
+        ]
+
     async def set(self, path: str, value: Any) -> None:
         collection, _id, path = self._parse_path(path)
 
@@ -79,15 +146,11 @@ class MongoManager:
                 " be updated."
             )
 
-        if await collection.find_one({"_id": _id}, {"_id": 1}):
-            await collection.update_one(
-                {"_id": _id}, {"$set": {path: value} if path else value}
-            )
-
-        else:
-            await collection.insert_one(
-                {"_id": _id, **create_nested_dict(path, value)}
-            )
+        await collection.update_one(
+            {"_id": _id},
+            {"$set": {path: value} if path else value},
+            upsert=True,
+        )
 
     async def push(
         self, path: str, value: Any, *, allow_duplicates: bool = True
@@ -100,19 +163,13 @@ class MongoManager:
                 " key for the push operation."
             )
 
-        if not (doc := await collection.find_one({"_id": _id}, {"_id": 1})):
-            await collection.insert_one(
-                {"_id": _id, **create_nested_dict(path, [value])}  # type: ignore
-            )
-            return True
-
-        if allow_duplicates or value not in find_in_nested_dict(
-            doc, path, default=[]
-        ):
-            await collection.update_one({"_id": _id}, {"$push": {path: value}})
-            return True
+        result = await collection.update_one(
+            {"_id": _id},
+            {"$push" if allow_duplicates else "$addToSet": {path: value}},
+            upsert=True,
+        )
 
-        return False
+        return bool(result.modified_count or result.upserted_id is not None)
 
     async def pull(self, path: str, value: Any) -> bool:
         collection, _id, path = self._parse_path(path)
@@ -123,15 +180,11 @@ class MongoManager:
                 " key for the pull operation."
             )
 
-        if value in find_in_nested_dict(
-            await collection.find_one({"_id": _id}, {path: 1}),
-            path,
-            default=[],
-        ):
-            await collection.update_one({"_id": _id}, {"$pull": {path: value}})
-            return True
+        result = await collection.update_one(
+            {"_id": _id}, {"$pull": {path: value}}
+        )
 
-        return False
+        return bool(result.modified_count)
 
     async def rem(self, path: str) -> None:  # type: ignore
         path: list[str] = path.split(".", 2)
@@ -6,6 +6,7 @@ __all__ = (
     "create_nested_dict",
     "find_in_nested_dict",
     "maybe_int",
+    "set_in_nested_dict",
     "NestedDict",
 )
 
@@ -47,6 +48,21 @@ def find_in_nested_dict(
     return find_in
 
 
+def set_in_nested_dict(
+    set_in: NestedDict, path: str | list[str], value: Any
+) -> None:
+    if isinstance(path, str):
+        return set_in_nested_dict(set_in, path.split("."), value)
+
+    for key in path[:-1]:
+        if not isinstance(set_in.get(key), dict):
+            set_in[key] = {}
+
+        set_in = set_in[key]
+
+    set_in[path[-1]] = value
+
+
 @overload
 def maybe_int(value: SupportsInt) -> int:
     ...
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from math import ceil, log
+from sys import getsizeof
+from typing import Any
+
+__all__ = ("BloomFilter", "TTLPolicy", "TinyLFU", "estimate_size")
+
+
+def estimate_size(value: Any) -> int:
+    size = 0
+    stack = [value]
+
+    while stack:
+        item = stack.pop()
+        size += getsizeof(item)
+
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+
+    return size
+
+
+class TTLPolicy:
+    def __init__(
+        self,
+        default: float | None = None,
+        *,
+        collections: dict[str, float | None] | None = None,
+    ) -> None:
+        self.default = default
+        self.collections = collections or {}
+
+    def get_ttl(self, key: str) -> float | None:
+        return self.collections.get(key.split(".", 1)[0], self.default)
+
+
+class TinyLFU:
+    # A count-min sketch of recent key frequencies. A new key only replaces the
+    # least recently used one when it has been requested more often, so
+    # one-off lookups can't push out frequently used entries.
+    def __init__(self, capacity: int, *, depth: int = 4) -> None:
+        width = 1
+
+        while width < capacity:
+            width <<= 1
+
+        self._mask = width - 1
+        self._depth = depth
+        self._rows = [bytearray(width) for _ in range(depth)]
+        self._sample_size = capacity * 10
+        self._additions = 0
+
+    def _indexes(self, key: str) -> list[int]:
+        first = hash(key)
+        second = (first >> 17) | 1
+
+        return [(first + i * second) & self._mask for i in range(self._depth)]
+
+    def record(self, key: str) -> None:
+        for row, index in zip(self._rows, self._indexes(key)):
+            if row[index] < 255:
+                row[index] += 1
+
+        self._additions += 1
+
+        if self._additions >= self._sample_size:
+            self._reset()
+
+    def estimate(self, key: str) -> int:
+        return min(
+            row[index] for row, index in zip(self._rows, self._indexes(key))
+        )
+
+    def admit(self, candidate: str, victim: str) -> bool:
+        return self.estimate(candidate) > self.estimate(victim)
+
+    def _reset(self) -> None:
+        # Halving every counter lets the sketch forget old popularity.
+        self._additions //= 2
+
+        for row in self._rows:
+            row[:] = bytes(count >> 1 for count in row)
+
+
+class BloomFilter:
+    # Answers "definitely absent" or "maybe present" for the _ids of a
+    # collection. Entries can't be removed, deleted documents just stay as
+    # false positives.
+    def __init__(self, capacity: int, *, error_rate: float = 0.01) -> None:
+        capacity = max(capacity, 1)
+        size = ceil(-capacity * log(error_rate) / log(2) ** 2)
+
+        self._size = size
+        self._hashes = max(1, round(size / capacity * log(2)))
+        self._bits = bytearray((size + 7) // 8)
+        self.ready = False
+
+    def _indexes(self, key: str) -> list[int]:
+        first = hash(key)
+        second = hash((key, 1)) | 1
+
+        return [(first + i * second) % self._size for i in range(self._hashes)]
+
+    def add(self, key: str) -> None:
+        for index in self._indexes(key):
+            self._bits[index >> 3] |= 1 << (index & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self._bits[index >> 3] & (1 << (index & 7))
+            for index in self._indexes(key)
+        )
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import logging
+from asyncio import CancelledError, Task, create_task, sleep
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Literal, Mapping
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from .cache import ABSENT
+from .misc import find_in_nested_dict, maybe_int
+
+if TYPE_CHECKING:
+    from .cacher import CachedMongoManager
+
+__all__ = ("ChangeWatcher",)
+
+log = logging.getLogger(__name__)
+
+# Raised by servers that aren't a replica set or a sharded cluster.
+CHANGE_STREAMS_UNSUPPORTED = {40573, 40324}
+
+ChangeListener = Callable[[dict[str, Any]], Any]
+
+
+class ChangeWatcher:
+    def __init__(
+        self,
+        manager: CachedMongoManager,
+        collections: Iterable[str],
+        *,
+        bloom_filters: Iterable[str] = (),
+        poll_interval: float = 30.0,
+        retry_interval: float = 5.0,
+    ) -> None:
+        self._manager = manager
+        self._collections = list(collections)
+        self._bloom_filters = list(bloom_filters)
+        self._bloom_task: Task | None = None
+        self._poll_interval = poll_interval
+        self._retry_interval = retry_interval
+        self._listeners: list[ChangeListener] = []
+        self._resume_token: Mapping[str, Any] | None = None
+        self._task: Task | None = None
+        self.mode: Literal["stream", "poll"] | None = None
+
+    def add_listener(self, listener: ChangeListener) -> ChangeListener:
+        self._listeners.append(listener)
+        return listener
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._reset_bloom_filters()
+
+        self._task.cancel()
+
+        try:
+            await self._task
+        except CancelledError:
+            pass
+
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._watch()
+            except OperationFailure as e:
+                # Inserts made before the stream is open again never reach
+                # mark_existing, so the filters are rebuilt after it opens.
+                # Polling can't notice inserts at all.
+                self.mode = None
+                self._reset_bloom_filters()
+
+                if e.code in CHANGE_STREAMS_UNSUPPORTED:
+                    log.warning(
+                        "Change streams are not supported by the server,"
+                        " falling back to polling every %s seconds.",
+                        self._poll_interval,
+                    )
+                    await self._poll()
+
+                # The resume token might be the problem, start from scratch.
+                self._resume_token = None
+                log.exception(
+                    "The change stream failed, reopening it in %s seconds.",
+                    self._retry_interval,
+                )
+                await sleep(self._retry_interval)
+            except PyMongoError:
+                log.exception(
+                    "The change stream was interrupted, resuming in %s"
+                    " seconds.",
+                    self._retry_interval,
+                )
+                await sleep(self._retry_interval)
+
+    async def _watch(self) -> None:
+        pipeline = [
+            {
+                "$match": {
+                    "ns.coll": {"$in": self._collections},
+                    "operationType": {
+                        "$in": ["insert", "update", "replace", "delete"]
+                    },
+                }
+            }
+        ]
+
+        # noinspection PyProtectedMember
+        async with self._manager._db.watch(
+            pipeline, resume_after=self._resume_token
+        ) as stream:
+            self.mode = "stream"
+
+            if self._resume_token is None:
+                # Anything could have changed before the stream was opened.
+                self._manager.uncache(self._collections)
+                self._reset_bloom_filters()
+
+                if self._bloom_filters:
+                    self._bloom_task = create_task(self._load_bloom_filters())
+
+            # Resumes from here even if the stream fails before any change.
+            self._resume_token = stream.resume_token
+
+            async for change in stream:
+                self._resume_token = stream.resume_token
+                self.handle_change(change)
+
+    def _reset_bloom_filters(self) -> None:
+        if self._bloom_task is not None:
+            self._bloom_task.cancel()
+            self._bloom_task = None
+
+        self._manager.drop_bloom_filters()
+
+    async def _load_bloom_filters(self) -> None:
+        for collection in self._bloom_filters:
+            try:
+                await self._manager.load_bloom_filter(
+                    collection, active=lambda: self.mode == "stream"
+                )
+            except PyMongoError:
+                log.exception(
+                    "Loading the bloom filter of %s failed.", collection
+                )
+
+    def handle_change(self, change: dict[str, Any]) -> None:
+        collection = change["ns"]["coll"]
+        _id = change["documentKey"]["_id"]
+        prefix = f"{collection}.{_id}"
+
+        if change["operationType"] != "delete":
+            self._manager.mark_existing(collection, _id)
+
+        if change["operationType"] == "update":
+            description = change["updateDescription"]
+
+            self._manager.uncache(
+                [
+                    f"{prefix}.{field}"
+                    for field in (
+                        *description.get("updatedFields", {}),
+                        *description.get("removedFields", []),
+                        *(
+                            array["field"]
+                            for array in description.get("truncatedArrays", [])
+                        ),
+                    )
+                ]
+            )
+        else:
+            self._manager.uncache(prefix)
+
+        for listener in self._listeners:
+            try:
+                listener(change)
+            except Exception:
+                log.exception("Change listener %r failed.", listener)
+
+    async def _poll(self) -> None:
+        self.mode = "poll"
+
+        while True:
+            await sleep(self._poll_interval)
+
+            try:
+                await self.refresh()
+            except PyMongoError:
+                log.exception("Polling the cached documents failed.")
+
+    async def refresh(self) -> None:
+        # Refetches every cached document of the watched collections and drops
+        # the cached paths that don't match the database anymore.
+        cached: dict[str, dict[str, list[tuple[str, Any]]]] = {}
+
+        # noinspection PyProtectedMember
+        for key, value in self._manager._cache.peek_items():
+            collection, _id, *path = key.split(".", 2)
+
+            if collection in self._collections:
+                cached.setdefault(collection, {}).setdefault(_id, []).append(
+                    (next(iter(path), ""), value)
+                )
+
+        for collection, documents in cached.items():
+            ids = list(documents)
+
+            for start in range(0, len(ids), 1000):
+                chunk = ids[start : start + 1000]
+
+                # noinspection PyProtectedMember
+                found = {
+                    str(document["_id"]): document
+                    async for document in self._manager._db[collection].find(
+                        {"_id": {"$in": [maybe_int(_id) for _id in chunk]}}
+                    )
+                }
+
+                stale = []
+
+                for _id in chunk:
+                    document = found.get(_id)
+
+                    for path, value in documents[_id]:
+                        if path:
+                            if value != find_in_nested_dict(
+                                document, path, default=ABSENT
+                            ):
+                                stale.append(f"{collection}.{_id}.{path}")
+                        elif value != document:
+                            stale.append(f"{collection}.{_id}")
+
+                self._manager.uncache(stale)
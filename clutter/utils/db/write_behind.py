@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+from copy import deepcopy
+from typing import TYPE_CHECKING, Any, Callable
+
+from pymongo import UpdateOne
+
+from ..batcher import Batcher
+from .misc import (
+    NestedDict,
+    create_nested_dict,
+    find_in_nested_dict,
+    set_in_nested_dict,
+)
+
+if TYPE_CHECKING:
+    # noinspection PyProtectedMember
+    from motor.motor_asyncio import AsyncIOMotorDatabase
+
+__all__ = ("WriteBehindQueue",)
+
+_MISSING = object()
+
+
+def _unset_in_nested_dict(unset_in: NestedDict, path: str) -> None:
+    *parents, key = path.split(".")
+
+    if isinstance(parent := find_in_nested_dict(unset_in, parents), dict):
+        parent.pop(key, None)
+
+
+class _DocumentWrites:
+    # Pending operations of a single document, keyed by path. The paths never
+    # overlap, so all of them fit into a single update.
+    __slots__ = ("ops",)
+
+    def __init__(self) -> None:
+        self.ops: dict[str, list[Any]] = {}
+
+    def _related(self, path: str) -> tuple[str | None, list[str]]:
+        ancestor = None
+        descendants = []
+
+        for other in self.ops:
+            if path.startswith(f"{other}."):
+                ancestor = other
+            elif other == path or other.startswith(f"{path}."):
+                descendants.append(other)
+
+        return ancestor, descendants
+
+    def set(self, path: str, value: Any) -> bool:
+        ancestor, descendants = self._related(path)
+
+        if ancestor is None:
+            for descendant in descendants:
+                del self.ops[descendant]
+
+            self.ops[path] = ["$set", value]
+            return True
+
+        operator, current = self.ops[ancestor]
+        rest = path[len(ancestor) + 1 :]
+
+        if operator == "$unset":
+            self.ops[ancestor] = ["$set", create_nested_dict(rest, value)]
+        elif isinstance(current, dict):
+            set_in_nested_dict(current, rest, value)
+        else:
+            return False
+
+        return True
+
+    def unset(self, path: str) -> bool:
+        ancestor, descendants = self._related(path)
+
+        if ancestor is None:
+            for descendant in descendants:
+                del self.ops[descendant]
+
+            self.ops[path] = ["$unset", ""]
+            return True
+
+        operator, current = self.ops[ancestor]
+
+        if operator == "$unset":
+            return True
+
+        if isinstance(current, dict):
+            _unset_in_nested_dict(current, path[len(ancestor) + 1 :])
+            return True
+
+        return False
+
+    def push(self, path: str, value: Any) -> bool:
+        ancestor, descendants = self._related(path)
+
+        if ancestor is not None:
+            operator, current = self.ops[ancestor]
+            rest = path[len(ancestor) + 1 :]
+
+            if operator == "$unset":
+                self.ops[ancestor] = [
+                    "$set",
+                    create_nested_dict(rest, [value]),
+                ]
+                return True
+
+            if isinstance(current, dict):
+                array = find_in_nested_dict(current, rest, default=_MISSING)
+
+                if array is _MISSING:
+                    set_in_nested_dict(current, rest, [value])
+                    return True
+
+                if isinstance(array, list):
+                    array.append(value)
+                    return True
+
+            return False
+
+        if not descendants:
+            self.ops[path] = ["$push", [value]]
+            return True
+
+        if descendants != [path]:
+            return False
+
+        operator, current = self.ops[path]
+
+        if operator == "$unset":
+            self.ops[path] = ["$set", [value]]
+        elif isinstance(current, list):
+            current.append(value)
+        else:
+            return False
+
+        return True
+
+    def apply(self, document: NestedDict | None, _id: Any) -> NestedDict:
+        document = deepcopy(document) if document else {"_id": _id}
+
+        for path, (operator, value) in self.ops.items():
+            if operator == "$set":
+                set_in_nested_dict(document, path, deepcopy(value))
+            elif operator == "$unset":
+                _unset_in_nested_dict(document, path)
+            else:
+                array = find_in_nested_dict(document, path)
+
+                if not isinstance(array, list):
+                    array = []
+                    set_in_nested_dict(document, path, array)
+
+                array.extend(deepcopy(value))
+
+        return document
+
+    def to_update(self) -> dict[str, dict[str, Any]]:
+        update: dict[str, dict[str, Any]] = {}
+
+        for path, (operator, value) in self.ops.items():
+            update.setdefault(operator, {})[path] = (
+                {"$each": value} if operator == "$push" else value
+            )
+
+        return update
+
+
+class WriteBehindQueue(Batcher):
+    def __init__(
+        self,
+        db: AsyncIOMotorDatabase,
+        *,
+        flush_interval: float = 1.0,
+        flush_size: int = 500,
+        on_flushed: Callable[[list[str], bool], Any] | None = None,
+    ) -> None:
+        super().__init__(flush_interval=flush_interval)
+        self._db = db
+        self._flush_size = flush_size
+        self._on_flushed = on_flushed
+        self._pending: dict[tuple[str, Any], _DocumentWrites] = {}
+        self._flushing: dict[tuple[str, Any], _DocumentWrites] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def has_pending(self, collection: str, _id: Any) -> bool:
+        key = (collection, _id)
+        return key in self._pending or key in self._flushing
+
+    def apply(
+        self, collection: str, _id: Any, document: NestedDict | None
+    ) -> NestedDict | None:
+        # Overlays the writes that haven't reached the database yet.
+        for writes in (
+            self._flushing.get((collection, _id)),
+            self._pending.get((collection, _id)),
+        ):
+            if writes is not None:
+                document = writes.apply(document, _id)
+
+        return document
+
+    async def set(
+        self, collection: str, _id: Any, path: str, value: Any
+    ) -> None:
+        await self._enqueue(collection, _id, "set", path, deepcopy(value))
+
+    async def unset(self, collection: str, _id: Any, path: str) -> None:
+        await self._enqueue(collection, _id, "unset", path)
+
+    async def push(
+        self, collection: str, _id: Any, path: str, value: Any
+    ) -> None:
+        await self._enqueue(collection, _id, "push", path, deepcopy(value))
+
+    async def _enqueue(
+        self, collection: str, _id: Any, operation: str, *args: Any
+    ) -> None:
+        writes = self._pending.setdefault((collection, _id), _DocumentWrites())
+
+        while not getattr(writes, operation)(*args):
+            # The write conflicts with a pending one in a way that can't be
+            # merged, so the pending ones have to land first.
+            await self.flush()
+            writes = self._pending.setdefault(
+                (collection, _id), _DocumentWrites()
+            )
+
+        if len(self._pending) >= self._flush_size:
+            await self.flush()
+        else:
+            self._schedule()
+
+    async def _flush(self) -> None:
+        if not self._pending:
+            return
+
+        self._flushing, self._pending = self._pending, {}
+
+        by_collection: dict[str, list[UpdateOne]] = {}
+
+        for (collection, _id), writes in self._flushing.items():
+            by_collection.setdefault(collection, []).append(
+                UpdateOne({"_id": _id}, writes.to_update(), upsert=True)
+            )
+
+        succeeded = False
+
+        try:
+            for collection, requests in by_collection.items():
+                await self._db[collection].bulk_write(requests, ordered=False)
+
+            succeeded = True
+        finally:
+            # Failed writes aren't retried, as parts of the batch might
+            # have been applied already. The callback is told about the
+            # failure so it can fall back to what the database has.
+            flushed = [
+                f"{collection}.{_id}" for collection, _id in self._flushing
+            ]
+            self._flushing = {}
+
+            if self._on_flushed is not None:
+                self._on_flushed(flushed, succeeded)
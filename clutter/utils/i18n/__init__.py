@@ -1,3 +1,6 @@
 from .errors import *
 from .i18n import *
 from .misc import *
+from .pack import *
+from .template import *
+from .watcher import *
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from argparse import ArgumentParser
+
+from .pack import build_pack
+
+parser = ArgumentParser(
+    description="Compiles the language files into a language pack."
+)
+parser.add_argument("lang_file_dir")
+parser.add_argument("--fallback-language", default="en-US")
+parser.add_argument("--output")
+
+args = parser.parse_args()
+
+print(build_pack(args.lang_file_dir, args.fallback_language, args.output))
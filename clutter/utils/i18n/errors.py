@@ -1,6 +1,14 @@
 from __future__ import annotations
 
-__all__ = ("I18NError", "UnknownTranslationCode", "NoFallback")
+from typing import AbstractSet
+
+__all__ = (
+    "I18NError",
+    "UnknownTranslationCode",
+    "NoFallback",
+    "MissingTemplateField",
+    "TemplateFieldMismatch",
+)
 
 
 class I18NError(Exception):
@@ -27,3 +35,36 @@ class NoFallback(I18NError):
             f"The fallback language ({self.fallback_language}) does not exist"
             f" in the languages directory ({self.language_file_directory})."
         )
+
+
+class MissingTemplateField(I18NError, KeyError):
+    def __init__(self, text: str, fields: AbstractSet[str]) -> None:
+        self.text = text
+        self.fields = fields
+
+    def __str__(self) -> str:
+        return (
+            f"Missing the fields {', '.join(sorted(self.fields))} for the"
+            f" translation: {self.text!r}"
+        )
+
+
+class TemplateFieldMismatch(I18NError):
+    def __init__(
+        self,
+        code: str,
+        language: str,
+        expected: frozenset[str],
+        got: frozenset[str],
+    ) -> None:
+        self.code = code
+        self.language = language
+        self.expected = expected
+        self.got = got
+
+    def __str__(self) -> str:
+        return (
+            f"The translation {self.code} in {self.language} uses the fields"
+            f" {sorted(self.got)}, but the fallback language uses"
+            f" {sorted(self.expected)}."
+        )
@@ -1,56 +1,298 @@
 from __future__ import annotations
 
-from os import listdir, path
-from typing import TYPE_CHECKING, Literal
+import logging
+from os import path, stat
+from typing import TYPE_CHECKING, Any, Callable, Literal, Protocol
 
-from json5 import load
-
-from .errors import NoFallback, UnknownTranslationCode
-from .misc import find_in_nested_dict
+from .errors import I18NError, NoFallback, UnknownTranslationCode
+from .pack import PACK_FILE_NAME, LanguagePack, find_sources, read_source
+from .template import Template, compile_templates
 
 if TYPE_CHECKING:
-    from discord import Message
-    from discord.ext.commands import Context
+    from discord.abc import Snowflake
 
-    from ...core.interaction import ClutterInteraction
     from ..db import CachedMongoManager
 
-__all__ = ("I18N",)
+    # Messages, contexts and interactions all have these.
+    class Invocation(Protocol):
+        @property
+        def author(self) -> Snowflake:
+            ...
+
+        @property
+        def guild(self) -> Snowflake | None:
+            ...
+
+
+__all__ = ("I18N", "Translator")
+
+log = logging.getLogger(__name__)
+
+ReloadListener = Callable[[list[str]], Any]
+
+
+class Translator:
+    # Translates into a language resolved beforehand, so rendering a batch of
+    # codes for one invocation doesn't look the language up every time.
+    __slots__ = ("language", "_table")
+
+    def __init__(self, language: str, table: dict[str, Template]) -> None:
+        self.language = language
+        self._table = table
+
+    def __call__(self, code: str, **kwargs: Any) -> str:
+        template = self._table.get(code)
+
+        if not template or not template.text:
+            raise UnknownTranslationCode(code)
+
+        return template.render(**kwargs)
 
 
 class I18N:
+    translator_class: type[Translator] = Translator
+
     def __init__(
         self,
         lang_file_dir: str,
         *,
         db: CachedMongoManager,
         fallback_language: str,
+        pack_file: str | None = None,
     ) -> None:
         self._db = db
-        self._languages = {}
         self._fallback_language = fallback_language
+        self._lang_file_dir = lang_file_dir
+        sources = find_sources(lang_file_dir)
 
-        files = listdir(lang_file_dir)
+        if fallback_language not in sources:
+            raise NoFallback(fallback_language, lang_file_dir)
 
-        for fn in files:
-            if not fn.endswith(("json", "json5")):
-                continue
+        self._pack = self._open_pack(
+            pack_file or path.join(lang_file_dir, PACK_FILE_NAME)
+        )
 
-            with open(path.join(lang_file_dir, fn)) as f:
-                self._languages[fn.rsplit(".", 1)[0]] = load(f)
+        # Flat "CODE.PATH" -> template tables, with the fallback language
+        # merged in beforehand so a translation is a single dict lookup.
+        self._sources: dict[str, str] = {}
+        self._languages: dict[str, dict[str, Template]] = {}
+        self._fallback: dict[str, Template] = {}
+        # The mtimes of the language files, for reloading.
+        self._mtimes: dict[str, int] = {}
 
-        if fallback_language not in self._languages:
-            raise NoFallback(fallback_language, lang_file_dir)
+        # "CODE.PATH" -> {language: text}, built on first use.
+        self._translations: dict[str, dict[str, str]] | None = None
+        self._listeners: list[ReloadListener] = []
 
-    def collect_translations(self, code: str) -> dict[str, str]:
-        return {
-            language: translation
-            for language, translation in map(
-                lambda kv: (kv[0], find_in_nested_dict(kv[1], code)),
-                self._languages.items(),
+        self._load(sources)
+
+    @staticmethod
+    def _open_pack(pack_file: str) -> LanguagePack | None:
+        if not path.exists(pack_file):
+            return None
+
+        try:
+            return LanguagePack(pack_file)
+        except (OSError, ValueError, EOFError):
+            log.warning(
+                "Couldn't open the language pack %s, reading the language"
+                " files instead.",
+                pack_file,
+                exc_info=True,
+            )
+            return None
+
+    def _in_pack(self, language: str, mtime: int) -> bool:
+        # A language file changed since the pack was built wins over the pack.
+        return (
+            self._pack is not None
+            and language in self._pack
+            and self._pack.mtime(language) == mtime
+        )
+
+    def _checked(self, language: str, mtimes: dict[str, int]) -> bool:
+        # build_pack checks every language against the fallback language, so
+        # a language is only checked again if the pack can't vouch for it.
+        return (
+            self._pack is not None
+            and self._pack.fallback_language == self._fallback_language
+            and self._in_pack(
+                self._fallback_language, mtimes[self._fallback_language]
             )
-            if translation
+            and self._in_pack(language, mtimes[language])
+        )
+
+    def _read(self, language: str, source: str, mtime: int) -> dict[str, str]:
+        if self._pack is not None and self._in_pack(language, mtime):
+            return self._pack.load(language)
+
+        return read_source(source)
+
+    @staticmethod
+    def _merge(
+        language: str, texts: dict[str, str], fallback: dict[str, Template]
+    ) -> dict[str, Template]:
+        return {**fallback, **compile_templates(language, texts, fallback)}
+
+    def _load(self, sources: dict[str, str]) -> list[str]:
+        # Compiles the languages whose files changed and swaps all tables in
+        # at once. Nothing is swapped if a file fails to compile, and
+        # translators handed out before keep their old tables. Languages the
+        # pack vouches for are left to be compiled on first use, any other
+        # one is compiled here so a broken file fails now instead of in a
+        # command. Returns the languages that were compiled.
+        mtimes = {
+            language: stat(source).st_mtime_ns
+            for language, source in sources.items()
         }
+        languages = {
+            language: table
+            for language, table in self._languages.items()
+            if language in sources
+            and self._mtimes.get(language) == mtimes[language]
+        }
+        fallback = self._fallback
+        compiled = []
+
+        if self._fallback_language not in languages:
+            fallback = compile_templates(
+                self._fallback_language,
+                self._read(
+                    self._fallback_language,
+                    sources[self._fallback_language],
+                    mtimes[self._fallback_language],
+                ),
+            )
+            compiled.append(self._fallback_language)
+
+            # The fallback language is merged into every other table.
+            languages = {self._fallback_language: fallback}
+
+        for language, source in sources.items():
+            if language in languages or (
+                language not in self._languages
+                and self._checked(language, mtimes)
+            ):
+                continue
+
+            languages[language] = self._merge(
+                language,
+                self._read(language, source, mtimes[language]),
+                fallback,
+            )
+            compiled.append(language)
+
+        if compiled or sources.keys() != self._sources.keys():
+            self._translations = None
+
+        self._sources, self._languages, self._fallback, self._mtimes = (
+            sources,
+            languages,
+            fallback,
+            mtimes,
+        )
+
+        return sorted(compiled)
+
+    def _table(self, language: str) -> dict[str, Template]:
+        if (table := self._languages.get(language)) is not None:
+            return table
+
+        if (source := self._sources.get(language)) is None:
+            return self._fallback
+
+        try:
+            mtime = stat(source).st_mtime_ns
+            table = self._merge(
+                language, self._read(language, source, mtime), self._fallback
+            )
+        except (I18NError, OSError, ValueError):
+            # The file changed after it was checked. Its users get the
+            # fallback language until a reload compiles it again.
+            log.exception(
+                "Couldn't compile the language %s, using the fallback"
+                " language instead.",
+                language,
+            )
+            self._languages[language] = self._fallback
+            self._mtimes.pop(language, None)
+            return self._fallback
+
+        self._languages[language], self._mtimes[language] = table, mtime
+
+        return table
+
+    def reload(self) -> list[str]:
+        sources = find_sources(self._lang_file_dir)
+
+        if self._fallback_language not in sources:
+            raise NoFallback(self._fallback_language, self._lang_file_dir)
+
+        changed = self._load(sources)
+
+        if changed:
+            for listener in self._listeners:
+                try:
+                    listener(changed)
+                except Exception:
+                    log.exception("Reload listener %r failed.", listener)
+
+        return changed
+
+    def add_listener(self, listener: ReloadListener) -> ReloadListener:
+        # Called with the reloaded languages after a reload changed any.
+        self._listeners.append(listener)
+        return listener
+
+    def _translation_index(self) -> dict[str, dict[str, str]]:
+        if self._translations is None:
+            self._translations = {}
+
+            for language, source in self._sources.items():
+                texts = self._read(language, source, self._mtimes[language])
+
+                for code, translation in texts.items():
+                    if translation:
+                        self._translations.setdefault(code, {})[
+                            language
+                        ] = translation
+
+        return self._translations
+
+    def collect_translations(self, code: str) -> dict[str, str]:
+        return dict(self._translation_index().get(code, {}))
+
+    def localize(self, code: str, language: str) -> str | None:
+        return self._translation_index().get(code, {}).get(language)
+
+    def release_translations(self) -> None:
+        # Reading every language file for the index is only worth it while
+        # the app commands are translated, it's rebuilt for the next time.
+        self._translations = None
+
+    def text(self, language: str, code: str) -> str | None:
+        # The text of a code without rendering it, from the compiled table.
+        if (template := self._table(language).get(code)) and template.text:
+            return template.text
+
+        return None
+
+    async def get_language(
+        self,
+        object_id: int,
+        *,
+        object_type: Literal["guild", "user"] = "user",
+    ) -> str:
+        return await self._db.get(
+            f"{object_type}s.{object_id}.language",
+            default=self._fallback_language,
+        )
+
+    def translator(self, language: str) -> Translator:
+        return self.translator_class(language, self._table(language))
+
+    def translate(self, language: str, code: str, **kwargs: Any) -> str:
+        return self.translator(language)(code, **kwargs)
 
     async def translate_with_id(
         self,
@@ -58,41 +300,53 @@ class I18N:
         code: str,
         *,
         object_type: Literal["guild", "user"] = "user",
+        **kwargs: Any,
     ) -> str:
-        translated = find_in_nested_dict(
-            self._languages.get(
-                await self._db.get(
-                    f"{object_type}s.{object_id}.language",
-                    default=self._fallback_language,
-                ),
-                self._fallback_language,
-            ),
+        return self.translate(
+            await self.get_language(object_id, object_type=object_type),
             code,
-            default=find_in_nested_dict(
-                self._languages[self._fallback_language],
-                code,
-            ),
+            **kwargs,
         )
-        if not translated:
-            raise UnknownTranslationCode(code)
 
-        return translated
+    async def get_translator(
+        self,
+        user_id: int,
+        guild_id: int | None,
+        *,
+        prefer_guild: bool = False,
+        cache: dict[bool, Translator] | None = None,
+    ) -> Translator:
+        # Invocations pass a cache of their own, so the language is looked up
+        # once per invocation and reused after. Outside of guilds the
+        # language of the user is used.
+        if (
+            cache is not None
+            and (translator := cache.get(prefer_guild)) is not None
+        ):
+            return translator
+
+        translator = self.translator(
+            await self.get_language(guild_id, object_type="guild")
+            if prefer_guild and guild_id is not None
+            else await self.get_language(user_id, object_type="user")
+        )
+
+        if cache is not None:
+            cache[prefer_guild] = translator
+
+        return translator
 
     async def __call__(
         self,
-        ctx: Message | Context | ClutterInteraction,
+        ctx: Invocation,
         code: str,
         *,
         prefer_guild: bool = False,
+        **kwargs: Any,
     ) -> str:
-        return (
-            await self.translate_with_id(
-                ctx.guild.id,  # type: ignore
-                code,
-                object_type="guild",
-            )
-            if prefer_guild
-            else await self.translate_with_id(
-                ctx.author.id, code, object_type="user"
-            )
+        translator = await self.get_translator(
+            ctx.author.id,
+            ctx.guild.id if ctx.guild else None,
+            prefer_guild=prefer_guild,
         )
+        return translator(code, **kwargs)
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Any, TypeVar
 
-__all__ = ("find_in_nested_dict", "NestedDict")
+__all__ = ("find_in_nested_dict", "flatten_nested_dict", "NestedDict")
 
 T = TypeVar("T")
 NestedDict = dict[str, Any | "NestedDict"]
@@ -21,3 +21,17 @@ def find_in_nested_dict(
             return default
 
     return find_in
+
+
+def flatten_nested_dict(
+    nested: NestedDict, prefix: str = ""
+) -> dict[str, Any]:
+    flat = {}
+
+    for key, value in nested.items():
+        if isinstance(value, dict):
+            flat.update(flatten_nested_dict(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+
+    return flat
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import marshal
+from mmap import ACCESS_READ, mmap
+from os import listdir, path, replace, stat
+from struct import Struct
+
+from json5 import load
+
+from .errors import NoFallback
+from .misc import flatten_nested_dict
+from .template import compile_templates
+
+__all__ = (
+    "LanguagePack",
+    "PACK_FILE_NAME",
+    "build_pack",
+    "find_sources",
+    "read_source",
+)
+
+PACK_FILE_NAME = "languages.pack"
+
+# The magic bytes and the length of the marshalled index. The index holds the
+# fallback language the pack was checked against, and maps each language to
+# the offset and length of its table and the mtime of its source.
+_HEADER = Struct("<8sQ")
+_MAGIC = b"CLTRI18\x02"
+
+
+def find_sources(lang_file_dir: str) -> dict[str, str]:
+    return {
+        fn.rsplit(".", 1)[0]: path.join(lang_file_dir, fn)
+        for fn in sorted(listdir(lang_file_dir))
+        if fn.endswith(("json", "json5"))
+    }
+
+
+def read_source(source: str) -> dict[str, str]:
+    with open(source) as f:
+        return {
+            code: str(text)
+            for code, text in flatten_nested_dict(load(f)).items()
+        }
+
+
+def build_pack(
+    lang_file_dir: str,
+    fallback_language: str,
+    pack_file: str | None = None,
+) -> str:
+    pack_file = pack_file or path.join(lang_file_dir, PACK_FILE_NAME)
+    sources = find_sources(lang_file_dir)
+
+    if fallback_language not in sources:
+        raise NoFallback(fallback_language, lang_file_dir)
+
+    tables = {
+        language: read_source(source) for language, source in sources.items()
+    }
+
+    # Broken translations fail the build instead of the bot.
+    fallback = compile_templates(fallback_language, tables[fallback_language])
+
+    for language, table in tables.items():
+        compile_templates(language, table, fallback)
+
+    index: dict[str, tuple[int, int, int]] = {}
+    blobs = []
+    offset = 0
+
+    for language, table in tables.items():
+        blob = marshal.dumps(table)
+        index[language] = (
+            offset,
+            len(blob),
+            stat(sources[language]).st_mtime_ns,
+        )
+        blobs.append(blob)
+        offset += len(blob)
+
+    index_blob = marshal.dumps((fallback_language, index))
+
+    # Written next to the pack and moved over it, so a running bot never
+    # maps a half written file.
+    with open(f"{pack_file}.tmp", "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, len(index_blob)))
+        f.write(index_blob)
+
+        for blob in blobs:
+            f.write(blob)
+
+    replace(f"{pack_file}.tmp", pack_file)
+
+    return pack_file
+
+
+class LanguagePack:
+    # Only the index is read up front, a table is unmarshalled from the mapped
+    # file the first time its language is used.
+    def __init__(self, pack_file: str) -> None:
+        with open(pack_file, "rb") as f:
+            self._map = mmap(f.fileno(), 0, access=ACCESS_READ)
+
+        try:
+            magic, index_length = _HEADER.unpack_from(self._map)
+
+            if magic != _MAGIC:
+                raise ValueError(f"Not a language pack: {pack_file}")
+
+            self.fallback_language: str
+            self._index: dict[str, tuple[int, int, int]]
+            self.fallback_language, self._index = marshal.loads(
+                self._map[_HEADER.size : _HEADER.size + index_length]
+            )
+        except Exception:
+            self._map.close()
+            raise
+
+        self._data_start = _HEADER.size + index_length
+
+    def __contains__(self, language: str) -> bool:
+        return language in self._index
+
+    def mtime(self, language: str) -> int:
+        return self._index[language][2]
+
+    def load(self, language: str) -> dict[str, str]:
+        offset, length, _ = self._index[language]
+        start = self._data_start + offset
+
+        return marshal.loads(self._map[start : start + length])
+
+    def close(self) -> None:
+        self._map.close()
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from _string import formatter_field_name_split  # type: ignore
+from string import Formatter
+from typing import Any
+
+from .errors import MissingTemplateField, TemplateFieldMismatch
+
+__all__ = ("Template", "compile_templates")
+
+_CONVERTERS = {"r": repr, "s": str, "a": ascii}
+
+
+class Template:
+    # A translation string parsed once into literal and field segments, which
+    # renders the same as str.format without parsing the string every time.
+    __slots__ = ("fields", "text", "_segments", "_static")
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.fields: frozenset[str] = frozenset()
+        self._segments: list[tuple[str, str | None, str | None, str]] = []
+
+        fields = set()
+
+        for literal, field, spec, conversion in Formatter().parse(text):
+            if field is not None:
+                if not field or field.isdigit():
+                    raise ValueError(
+                        f"Positional fields are not supported: {text!r}"
+                    )
+
+                fields.add(formatter_field_name_split(field)[0])
+
+                # Nested fields in the spec are resolved while rendering.
+                fields.update(
+                    formatter_field_name_split(nested)[0]
+                    for _, nested, _, _ in Formatter().parse(spec or "")
+                    if nested
+                )
+
+            self._segments.append((literal, field, conversion, spec or ""))
+
+        self.fields = frozenset(fields)
+
+        # Without fields the only work is unescaping the braces, done once.
+        self._static = (
+            None
+            if fields
+            else "".join(literal for literal, _, _, _ in self._segments)
+        )
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __repr__(self) -> str:
+        return f"<Template text={self.text!r}>"
+
+    def render(self, **kwargs: Any) -> str:
+        if self._static is not None:
+            return self._static
+
+        if missing := self.fields - kwargs.keys():
+            raise MissingTemplateField(self.text, missing)
+
+        parts = []
+
+        for literal, field, conversion, spec in self._segments:
+            parts.append(literal)
+
+            if field is None:
+                continue
+
+            if field in kwargs:
+                value = kwargs[field]
+            else:
+                # Attribute and item access like {user.name} or {items[0]}.
+                first, rest = formatter_field_name_split(field)
+                value = kwargs[first]
+
+                for is_attribute, key in rest:
+                    value = getattr(value, key) if is_attribute else value[key]
+
+            if conversion:
+                value = _CONVERTERS[conversion](value)
+
+            if "{" in spec:
+                spec = spec.format(**kwargs)
+
+            parts.append(format(value, spec))
+
+        return "".join(parts)
+
+
+def compile_templates(
+    language: str,
+    texts: dict[str, str],
+    fallback: dict[str, Template] | None = None,
+) -> dict[str, Template]:
+    compiled = {code: Template(text) for code, text in texts.items()}
+
+    if fallback is None:
+        return compiled
+
+    # Every language has to use the same fields as the fallback language,
+    # so a missing or misspelled field fails here instead of in a command.
+    for code, template in compiled.items():
+        if (
+            expected := fallback.get(code)
+        ) and expected.fields != template.fields:
+            raise TemplateFieldMismatch(
+                code, language, expected.fields, template.fields
+            )
+
+    return compiled
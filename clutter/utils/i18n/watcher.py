@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import logging
+from asyncio import CancelledError, Task, create_task, sleep
+from typing import TYPE_CHECKING
+
+from .errors import I18NError
+
+if TYPE_CHECKING:
+    from .i18n import I18N
+
+__all__ = ("LanguageFileWatcher",)
+
+log = logging.getLogger(__name__)
+
+
+class LanguageFileWatcher:
+    # Polls the mtimes of the language files, which is a handful of stat
+    # calls, and reloads the languages whose files changed.
+    def __init__(self, i18n: I18N, *, interval: float = 5.0) -> None:
+        self._i18n = i18n
+        self._interval = interval
+        self._task: Task | None = None
+        self._last_error: str | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+
+        try:
+            await self._task
+        except CancelledError:
+            pass
+
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await sleep(self._interval)
+
+            try:
+                changed = self._i18n.reload()
+            except (I18NError, OSError, ValueError) as e:
+                # A broken file keeps failing until it's fixed, log it once.
+                if str(e) != self._last_error:
+                    self._last_error = str(e)
+                    log.exception("Reloading the language files failed.")
+
+                continue
+
+            self._last_error = None
+
+            if changed:
+                log.info("Reloaded the languages %s.", ", ".join(changed))
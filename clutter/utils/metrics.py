@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from functools import wraps
+from time import perf_counter
+from typing import Any, Awaitable, Callable, ParamSpec, TypeVar
+
+from aiohttp import web
+
+__all__ = (
+    "DEFAULT_BUCKETS",
+    "Histogram",
+    "Metrics",
+    "MetricsServer",
+    "timed",
+    "timed_async",
+)
+
+T = TypeVar("T")
+P = ParamSpec("P")
+
+DEFAULT_BUCKETS = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Histogram:
+    # Counts observations into fixed buckets, the last one catches everything
+    # above the highest bound.
+    __slots__ = ("bounds", "count", "counts", "sum")
+
+    def __init__(self, bounds: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.bounds = bounds
+        self.count = 0
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        # The upper bound of the bucket the quantile falls in.
+        rank = q * self.count
+        seen = 0
+
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+
+            if seen >= rank:
+                return bound
+
+        return float("inf")
+
+
+def timed(func: Callable[P, T], histogram: Histogram) -> Callable[P, T]:
+    @wraps(func)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        start = perf_counter()
+
+        try:
+            return func(*args, **kwargs)
+        finally:
+            histogram.observe(perf_counter() - start)
+
+    return wrapper
+
+
+def timed_async(
+    func: Callable[P, Awaitable[T]], histogram: Histogram
+) -> Callable[P, Awaitable[T]]:
+    @wraps(func)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        start = perf_counter()
+
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            histogram.observe(perf_counter() - start)
+
+    return wrapper
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels, **extra: str) -> str:
+    if not (pairs := [*labels, *extra.items()]):
+        return ""
+
+    return (
+        "{"
+        + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs)
+        + "}"
+    )
+
+
+class Metrics:
+    # Histograms keyed by name and labels, plus collectors that return the
+    # counters of the components that keep their own stats.
+    def __init__(self, bounds: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self._bounds = bounds
+        self.histograms: dict[str, dict[Labels, Histogram]] = {}
+        self.collectors: dict[str, Callable[[], dict[str, Any]]] = {}
+
+    def histogram(self, name: str, **labels: str) -> Histogram:
+        by_labels = self.histograms.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+
+        if (histogram := by_labels.get(key)) is None:
+            histogram = by_labels[key] = Histogram(self._bounds)
+
+        return histogram
+
+    def add_collector(
+        self, name: str, collector: Callable[[], dict[str, Any]]
+    ) -> None:
+        self.collectors[name] = collector
+
+    def render(self) -> str:
+        # The Prometheus text exposition format.
+        lines = []
+
+        for name, by_labels in sorted(self.histograms.items()):
+            lines.append(f"# TYPE {name} histogram")
+
+            for labels, histogram in sorted(by_labels.items()):
+                cumulative = 0
+
+                for bound, count in zip(
+                    (*histogram.bounds, "+Inf"), histogram.counts
+                ):
+                    cumulative += count
+                    lines.append(
+                        f"{name}_bucket"
+                        f"{_format_labels(labels, le=str(bound))}"
+                        f" {cumulative}"
+                    )
+
+                lines.append(
+                    f"{name}_sum{_format_labels(labels)} {histogram.sum}"
+                )
+                lines.append(
+                    f"{name}_count{_format_labels(labels)} {histogram.count}"
+                )
+
+        for name, collector in sorted(self.collectors.items()):
+            for key, value in sorted(collector().items()):
+                lines.append(f"# TYPE {name}_{key} untyped")
+                lines.append(f"{name}_{key} {float(value)}")
+
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        lines = []
+
+        for name, by_labels in sorted(self.histograms.items()):
+            for labels, histogram in sorted(by_labels.items()):
+                if not histogram.count:
+                    continue
+
+                lines.append(
+                    f"{name}{_format_labels(labels)}"
+                    f" count={histogram.count}"
+                    f" mean={histogram.sum / histogram.count * 1000:.2f}ms"
+                    f" p50<={histogram.quantile(0.5) * 1000:g}ms"
+                    f" p95<={histogram.quantile(0.95) * 1000:g}ms"
+                    f" p99<={histogram.quantile(0.99) * 1000:g}ms"
+                )
+
+        for name, collector in sorted(self.collectors.items()):
+            lines.append(
+                f"{name} "
+                + " ".join(
+                    f"{key}={value}"
+                    for key, value in sorted(collector().items())
+                )
+            )
+
+        return "\n".join(lines)
+
+
+class MetricsServer:
+    def __init__(
+        self, metrics: Metrics, port: int, *, host: str = "127.0.0.1"
+    ) -> None:
+        self._metrics = metrics
+        self._port = port
+        self._host = host
+        self._runner: web.AppRunner | None = None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        return web.Response(
+            text=self._metrics.render(),
+            content_type="text/plain",
+            charset="utf-8",
+        )
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self._host, self._port).start()
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import signal
+from asyncio import sleep
+from collections import Counter
+from contextvars import ContextVar
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any
+
+__all__ = ("SamplingProfiler", "current_command")
+
+# Set for the duration of a command, so samples can be filtered by it.
+current_command: ContextVar[str | None] = ContextVar(
+    "current_command", default=None
+)
+
+Sample = tuple[str | None, tuple[CodeType, ...]]
+
+
+def _format_code(code: CodeType) -> str:
+    return (
+        f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+    )
+
+
+class SamplingProfiler:
+    # Samples the stack of the main thread every interval seconds of CPU time
+    # with SIGPROF, so an idle bot takes almost no samples. The handler only
+    # counts code objects, they are formatted once profiling stops.
+    supported = hasattr(signal, "setitimer")
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self._interval = interval
+        self._samples: Counter[Sample] = Counter()
+        self._previous: Any = None
+        self.running = False
+
+    def _sample(self, signum: int, frame: FrameType | None) -> None:
+        stack = []
+
+        while frame is not None:
+            stack.append(frame.f_code)
+            frame = frame.f_back
+
+        self._samples[(current_command.get(), tuple(stack))] += 1
+
+    def start(self) -> None:
+        if self.running:
+            raise RuntimeError("The profiler is already running.")
+
+        self._samples = Counter()
+        self._previous = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self._interval, self._interval)
+        self.running = True
+
+    def stop(self) -> Counter[Sample]:
+        if self.running:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, self._previous)
+            self.running = False
+
+        return self._samples
+
+    async def profile(
+        self, seconds: float, *, command: str | None = None
+    ) -> str:
+        self.start()
+
+        try:
+            await sleep(seconds)
+        finally:
+            samples = self.stop()
+
+        return self.collapse(samples, command=command)
+
+    @staticmethod
+    def collapse(
+        samples: Counter[Sample], *, command: str | None = None
+    ) -> str:
+        # The collapsed stack format flamegraph.pl and speedscope read, with
+        # the command as the root frame.
+        stacks: Counter[str] = Counter()
+
+        for (tag, stack), count in samples.items():
+            if command is not None and tag != command:
+                continue
+
+            frames = [f"command:{tag or '-'}"]
+            frames.extend(_format_code(code) for code in reversed(stack))
+            stacks[";".join(frames)] += count
+
+        return "\n".join(
+            f"{stack} {count}" for stack, count in stacks.most_common()
+        )
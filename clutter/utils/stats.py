@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+
+__all__ = ("Stats",)
+
+
+@dataclass(slots=True)
+class Stats:
+    # The counters of a component. Subclasses are dataclasses too, with every
+    # counter defaulting to zero.
+    def to_dict(self) -> dict[str, float]:
+        return asdict(self)
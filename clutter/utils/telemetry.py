@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from asyncio import Future, get_running_loop
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from dataclasses import dataclass
+from functools import partial
+from time import monotonic
+from typing import Any
+
+from sentry_sdk import capture_exception
+
+from .stats import Stats
+from .webhook import fingerprint
+
+__all__ = ("ExceptionReporter", "ExceptionReporterStats", "TracesSampler")
+
+
+class TracesSampler:
+    # Gives every transaction name about target sampled transactions per
+    # window. Rare commands are always traced, frequent ones like ping get a
+    # rate that shrinks with their volume. Fixed rates in rates win, except
+    # for names that failed within failure_window seconds, which are always
+    # traced. Sampling is decided when a transaction starts, so a failure can
+    # only be traced on the runs that follow it.
+    def __init__(
+        self,
+        *,
+        rates: dict[str, float] | None = None,
+        target: int = 10,
+        window: float = 60.0,
+        min_rate: float = 0.001,
+        failure_window: float = 600.0,
+    ) -> None:
+        self.rates = rates or {}
+        self._target = target
+        self._window = window
+        self._min_rate = min_rate
+        self._failure_window = failure_window
+        self._failed: dict[str, float] = {}
+        self._counts: dict[str, int] = {}
+        self._previous: dict[str, int] = {}
+        self._window_end = 0.0
+
+    def __call__(self, sampling_context: dict[str, Any]) -> float:
+        if (parent := sampling_context.get("parent_sampled")) is not None:
+            return float(parent)
+
+        name = sampling_context["transaction_context"].get("name", "")
+        now = monotonic()
+
+        if (failed := self._failed.get(name)) is not None:
+            if now - failed < self._failure_window:
+                return 1.0
+
+            del self._failed[name]
+
+        if (rate := self.rates.get(name)) is not None:
+            return rate
+
+        if now >= self._window_end:
+            self._previous, self._counts = self._counts, {}
+            self._window_end = now + self._window
+
+        count = self._counts[name] = self._counts.get(name, 0) + 1
+
+        # The previous window smooths the rate at the start of a new one.
+        volume = max(count, self._previous.get(name, 0))
+
+        return max(self._min_rate, min(1.0, self._target / volume))
+
+    def mark_failed(self, name: str) -> None:
+        self._failed[name] = monotonic()
+
+
+@dataclass(slots=True)
+class ExceptionReporterStats(Stats):
+    captured: int = 0
+    deduplicated: int = 0
+    dropped: int = 0
+
+
+class ExceptionReporter:
+    # Sends exceptions to Sentry from its own small thread pool, so a slow
+    # Sentry doesn't hold up the default executor. An error with the same
+    # fingerprint as one captured within dedupe_window seconds is skipped,
+    # and captures are dropped once max_pending are waiting.
+    def __init__(
+        self,
+        *,
+        max_workers: int = 2,
+        max_pending: int = 50,
+        dedupe_window: float = 60.0,
+    ) -> None:
+        self._executor = ThreadPoolExecutor(
+            max_workers, thread_name_prefix="sentry-capture"
+        )
+        self._max_pending = max_pending
+        self._dedupe_window = dedupe_window
+        self._pending = 0
+        # Oldest first, so expired fingerprints are popped from the front.
+        self._seen: OrderedDict[str, float] = OrderedDict()
+        self.stats = ExceptionReporterStats()
+
+    def capture(self, error: BaseException) -> bool:
+        now = monotonic()
+        key = fingerprint(error)
+
+        while (
+            self._seen
+            and now - next(iter(self._seen.values())) >= self._dedupe_window
+        ):
+            self._seen.popitem(last=False)
+
+        if key in self._seen:
+            self.stats.deduplicated += 1
+            return False
+
+        if self._pending >= self._max_pending:
+            self.stats.dropped += 1
+            return False
+
+        self._seen[key] = now
+        self._pending += 1
+        self.stats.captured += 1
+
+        # The context is copied so the capture sees the scope of the caller.
+        ctx = copy_context()
+        future = get_running_loop().run_in_executor(
+            self._executor, partial(ctx.run, capture_exception, error)
+        )
+        future.add_done_callback(self._done)
+
+        return True
+
+    def _done(self, future: Future) -> None:
+        self._pending -= 1
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,4 @@
+from .error_dispatcher import *
+from .log_sink import *
+from .rate_limiter import *
+from .webhook_queue import *
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from hashlib import sha1
+from itertools import islice
+from traceback import extract_tb, format_exception
+from typing import TYPE_CHECKING, Any
+
+from ..text_file import TextFile
+from .rate_limiter import RateLimiter
+from .webhook_queue import WebhookQueue, WebhookQueueStats
+
+if TYPE_CHECKING:
+    from discord import Webhook
+
+__all__ = ("ErrorDispatcher", "ErrorDispatcherStats", "fingerprint")
+
+# The most attachments a single webhook message can have.
+MAX_FILES = 10
+
+
+def fingerprint(error: BaseException) -> str:
+    # The type and the frames the error went through, without the message,
+    # which often contains IDs that differ between invocations.
+    return sha1(
+        "\n".join(
+            [
+                f"{type(error).__module__}.{type(error).__qualname__}",
+                *(
+                    f"{frame.filename}:{frame.lineno}:{frame.name}"
+                    for frame in extract_tb(error.__traceback__)
+                ),
+            ]
+        ).encode()
+    ).hexdigest()
+
+
+class _Report:
+    __slots__ = ("count", "first_seen", "last_seen", "text")
+
+    def __init__(self, text: str, now: datetime) -> None:
+        self.count = 1
+        self.first_seen = now
+        self.last_seen = now
+        self.text = text
+
+
+@dataclass(slots=True)
+class ErrorDispatcherStats(WebhookQueueStats):
+    grouped: int = 0
+    reports: int = 0
+
+
+class ErrorDispatcher(WebhookQueue[ErrorDispatcherStats]):
+    # Collects error reports in the background and sends them on a timer,
+    # with up to ten reports per webhook message. Repeats of the same error
+    # are counted instead of sent again, and reports are dropped once
+    # max_pending different errors are waiting.
+    def __init__(
+        self,
+        webhook: Webhook,
+        *,
+        limiter: RateLimiter | None = None,
+        flush_interval: float = 5.0,
+        max_pending: int = 100,
+        max_attempts: int = 3,
+    ) -> None:
+        super().__init__(
+            webhook,
+            stats=ErrorDispatcherStats(),
+            limiter=limiter,
+            flush_interval=flush_interval,
+            max_attempts=max_attempts,
+        )
+        self._max_pending = max_pending
+        self._pending: dict[str, _Report] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def report(self, error: BaseException, head: str) -> bool:
+        now = datetime.now(timezone.utc)
+        key = fingerprint(error)
+
+        if (report := self._pending.get(key)) is not None:
+            report.count += 1
+            report.last_seen = now
+            self.stats.grouped += 1
+            return True
+
+        if len(self._pending) >= self._max_pending:
+            self.stats.dropped += 1
+            return False
+
+        traceback = "".join(
+            format_exception(type(error), error, error.__traceback__)
+        )
+        self._pending[key] = _Report(f"{head}\nTraceback:\n{traceback}", now)
+        self.stats.reports += 1
+        self._schedule()
+
+        return True
+
+    @staticmethod
+    def _message(batch: list[tuple[str, _Report]]) -> dict[str, Any]:
+        return {
+            "content": (
+                f"{len(batch)} errors,"
+                f" {sum(report.count for _, report in batch)} occurrences."
+            ),
+            "files": [
+                TextFile(
+                    f"Occurrences: {report.count}\nFirst seen:"
+                    f" {report.first_seen:%Y-%m-%d %H:%M:%S} UTC"
+                    "\nLast seen:"
+                    f" {report.last_seen:%Y-%m-%d %H:%M:%S} UTC"
+                    f"\n{report.text}",
+                    f"error-{key[:8]}.txt",
+                )
+                for key, report in batch
+            ],
+        }
+
+    async def _flush(self) -> None:
+        reports, self._pending = self._pending, {}
+        items = iter(reports.items())
+
+        while batch := list(islice(items, MAX_FILES)):
+            await self._send(len(batch), lambda: self._message(batch))
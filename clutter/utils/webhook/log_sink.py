@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from collections import deque
+from itertools import islice
+from typing import TYPE_CHECKING
+
+from .rate_limiter import RateLimiter
+from .webhook_queue import WebhookQueue, WebhookQueueStats
+
+if TYPE_CHECKING:
+    from discord import Embed, Webhook
+
+__all__ = ("LogSink",)
+
+# The most embeds a single webhook message can have.
+MAX_EMBEDS = 10
+
+
+class LogSink(WebhookQueue[WebhookQueueStats]):
+    # Queues log embeds and sends them in order, up to ten per message, so a
+    # burst of incidents turns into a few messages instead of a task each.
+    # Embeds are dropped once max_queue are waiting.
+    def __init__(
+        self,
+        webhook: Webhook,
+        *,
+        limiter: RateLimiter | None = None,
+        flush_interval: float = 1.0,
+        max_queue: int = 500,
+        max_attempts: int = 3,
+    ) -> None:
+        super().__init__(
+            webhook,
+            stats=WebhookQueueStats(),
+            limiter=limiter,
+            flush_interval=flush_interval,
+            max_attempts=max_attempts,
+        )
+        self._max_queue = max_queue
+        self._queue: deque[Embed] = deque()
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def emit(self, embed: Embed) -> bool:
+        if len(self._queue) >= self._max_queue:
+            self.stats.dropped += 1
+            return False
+
+        self._queue.append(embed)
+        self._schedule()
+
+        return True
+
+    async def _flush(self) -> None:
+        while self._queue:
+            batch = list(islice(self._queue, MAX_EMBEDS))
+
+            await self._send(len(batch), lambda: {"embeds": batch})
+
+            # Only removed once handled, so a cancelled send is retried by
+            # the flush on shutdown.
+            for _ in batch:
+                self._queue.popleft()
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from asyncio import Lock, sleep
+from collections import deque
+from dataclasses import dataclass
+from time import monotonic
+
+from discord import HTTPException
+
+from ..stats import Stats
+
+__all__ = ("RateLimiter", "RateLimiterStats")
+
+
+@dataclass(slots=True)
+class RateLimiterStats(Stats):
+    acquired: int = 0
+    limited: int = 0
+    waited: float = 0.0
+
+
+class RateLimiter:
+    # Shared by everything that sends to webhooks. Allows rate sends per per
+    # seconds, and pauses every sender for the Retry-After of a 429.
+    def __init__(self, rate: int = 5, per: float = 2.0) -> None:
+        self._rate = rate
+        self._per = per
+        self._sends: deque[float] = deque()
+        self._resume_at = 0.0
+        self._lock = Lock()
+        self.stats = RateLimiterStats()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = monotonic()
+
+                if now < self._resume_at:
+                    delay = self._resume_at - now
+                else:
+                    while self._sends and now - self._sends[0] >= self._per:
+                        self._sends.popleft()
+
+                    if len(self._sends) < self._rate:
+                        self._sends.append(now)
+                        self.stats.acquired += 1
+                        return
+
+                    delay = self._per - (now - self._sends[0])
+
+                self.stats.waited += delay
+                await sleep(delay)
+
+    def retry_after(self, seconds: float) -> None:
+        self._resume_at = max(self._resume_at, monotonic() + seconds)
+        self.stats.limited += 1
+
+    def handle_error(self, error: HTTPException) -> bool:
+        # Returns whether the request was rate limited and can be retried.
+        if error.status != 429:
+            return False
+
+        headers = getattr(error.response, "headers", {})
+
+        try:
+            retry_after = float(headers.get("Retry-After", self._per))
+        except ValueError:
+            retry_after = self._per
+
+        self.retry_after(retry_after)
+        return True
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Generic, TypeVar
+
+from aiohttp import ClientError
+from discord import HTTPException
+
+from ..batcher import Batcher
+from ..stats import Stats
+from .rate_limiter import RateLimiter
+
+if TYPE_CHECKING:
+    from discord import Webhook
+
+__all__ = ("WebhookQueue", "WebhookQueueStats")
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class WebhookQueueStats(Stats):
+    dropped: int = 0
+    failed: int = 0
+    messages: int = 0
+    retried: int = 0
+    sent: int = 0
+
+
+S = TypeVar("S", bound=WebhookQueueStats)
+
+
+class WebhookQueue(Batcher, Generic[S]):
+    # Sends batches to a webhook through the shared rate limiter. A rate
+    # limited message is sent again, up to max_attempts times in total.
+    # Subclasses pass their own stats, which may count more.
+    def __init__(
+        self,
+        webhook: Webhook,
+        *,
+        stats: S,
+        limiter: RateLimiter | None,
+        flush_interval: float,
+        max_attempts: int,
+    ) -> None:
+        super().__init__(flush_interval=flush_interval)
+        self._webhook = webhook
+        self._limiter = limiter or RateLimiter()
+        self._max_attempts = max_attempts
+        self.stats = stats
+
+    async def _send(
+        self, items: int, build: Callable[[], dict[str, Any]]
+    ) -> None:
+        # build is called for every attempt, files can't be sent twice.
+        attempts = 0
+
+        while True:
+            attempts += 1
+            await self._limiter.acquire()
+
+            try:
+                await self._webhook.send(**build())
+            except (HTTPException, ClientError, OSError) as e:
+                if (
+                    isinstance(e, HTTPException)
+                    and self._limiter.handle_error(e)
+                    and attempts < self._max_attempts
+                ):
+                    self.stats.retried += 1
+                    continue
+
+                self.stats.failed += items
+                log.exception(
+                    "%s couldn't send %s items.", type(self).__name__, items
+                )
+            else:
+                self.stats.messages += 1
+                self.stats.sent += items
+
+            return